@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an OpenAI-compatible model server.
+Answers /chat/completions with canned summaries after a configurable delay,
+so the summarization pipeline can be run and benchmarked offline.
+
+Usage:
+    python benchmarks/fake_model_server.py [--port 8000] [--latency 0.3]
+
+Then run the tracker against it:
+    SUMMARIZER_BACKEND=openai OPENAI_BASE_URL=http://127.0.0.1:8000/v1 python main.py
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8000
+DEFAULT_LATENCY = 0.3
+# Extra delay per 1000 prompt characters, so bigger prompts cost more like on a real server
+DEFAULT_LATENCY_PER_1K_CHARS = 0.02
+
+def first_sentence(text):
+    text = " ".join(text.split())
+    match = re.search(r'.+?[.!?](?=\s|$)', text)
+    return (match.group(0) if match else text[:200]).strip()
+
+def answer(prompt):
+    """Build a plausible response: a JSON object for batched prompts, one sentence otherwise."""
+    if "Updates:" in prompt:
+        items_text = prompt.split("Updates:", 1)[1].strip()
+        items, _ = json.JSONDecoder().raw_decode(items_text)
+        return json.dumps({
+            item["id"]: f"{item['type'].title()} update: {first_sentence(item.get('content') or item.get('diff') or '')}"
+            for item in items
+        })
+    marker = "Diff:" if "Diff:" in prompt else "Content:"
+    return first_sentence(prompt.split(marker, 1)[-1])
+
+class FakeModelHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real inference server
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        prompt = (body.get("messages") or [{}])[-1].get("content", "")
+        server = self.server
+        time.sleep(server.latency + server.latency_per_1k_chars * len(prompt) / 1000)
+        with server.lock:
+            server.request_count += 1
+        self.send_json(200, {
+            "id": f"fake-{server.request_count}",
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer(prompt)}, "finish_reason": "stop"}],
+        })
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port=0, latency=DEFAULT_LATENCY, latency_per_1k_chars=DEFAULT_LATENCY_PER_1K_CHARS):
+    """Start the server in a daemon thread. Returns (server, base_url); port 0 picks a free port."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeModelHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.latency_per_1k_chars = latency_per_1k_chars
+    server.request_count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible model server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="seconds per request")
+    parser.add_argument("--latency-per-1k-chars", type=float, default=DEFAULT_LATENCY_PER_1K_CHARS)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency, args.latency_per_1k_chars)
+    print(f"Fake model server listening on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+HTML parser backend benchmark.
+Parses saved HTML fixtures with every available backend and reports
+parse/extract time and peak memory per backend.
+
+Usage:
+    python benchmarks/parser_benchmark.py                 # Benchmark fixtures in benchmarks/fixtures
+    python benchmarks/parser_benchmark.py save URL [URL]  # Save pages as fixtures
+"""
+
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+ITERATIONS = 5
+
+# Same selector lists the changelog and blog scrapers walk
+SELECTORS = [
+    "article h2", ".changelog-entry h2", ".release-note h2", ".update-title", "h2",
+    ".changelog h1", ".release h1", "h1", ".entry-title", ".post-title",
+    ".post-excerpt", ".post-summary", ".entry-summary", "p.lead", ".post-content p",
+]
+
+def generate_fixture():
+    """Build a large synthetic marketing page when no fixtures have been saved."""
+    sections = []
+    for i in range(400):
+        sections.append(f"""
+        <section class="feature feature-{i}" data-variant="{i % 2}">
+            <div class="card"><h3 class="card-title">Feature {i}</h3>
+            <p>Automate workflow number {i} with <a href="/docs/{i}?v={i}">integrations</a>,
+            <strong>retries</strong> and <em>observability</em> built in.</p>
+            <ul><li>Plan A ${i}/mo</li><li>Plan B ${i * 2}/mo</li><li>Enterprise</li></ul></div>
+            <script>window.__state_{i} = {{"id": {i}}};</script>
+        </section>""")
+    return f"""<!doctype html><html><head><title>Synthetic</title>
+    <style>.card {{ padding: 1em; }}</style></head><body>
+    <nav><a href="/">Home</a><a href="/pricing">Pricing</a></nav>
+    <main>{''.join(sections)}<article><h2>Release notes</h2><p class="lead">Latest release.</p></article></main>
+    <footer>Footer</footer></body></html>"""
+
+def load_fixtures():
+    """Read all saved fixtures, generating a synthetic one if there are none."""
+    fixtures = sorted(FIXTURES_DIR.glob("*.html"))
+    if not fixtures:
+        return {"synthetic.html": generate_fixture()}
+    return {path.name: path.read_text(encoding="utf-8", errors="replace") for path in fixtures}
+
+def save_fixtures(urls):
+    """Download pages through the shared session and save them as fixtures."""
+    from http_client import session
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for url in urls:
+        resp = session.get(url, timeout=20)
+        resp.raise_for_status()
+        name = "".join(ch if ch.isalnum() else "_" for ch in url.split("://", 1)[-1]).strip("_")
+        path = FIXTURES_DIR / f"{name[:80]}.html"
+        path.write_text(resp.text, encoding="utf-8")
+        print(f"Saved {url} -> {path} ({len(resp.text) // 1024} KB)")
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB, where the platform supports it."""
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and KB on Linux
+        return usage // 1024 if sys.platform == "darwin" else usage
+    except ImportError:
+        return None
+
+def extract(soup):
+    """Run the same cleanup and lookups the scrapers do on a parsed page."""
+    from scrapers.normalize import normalize_soup
+
+    normalize_soup(soup)
+    for selector in SELECTORS:
+        soup.select_one(selector)
+    main_content = soup.find("main") or soup.find("body")
+    if main_content:
+        main_content.get_text(separator="\n", strip=True)
+
+def run_worker(backend):
+    """Benchmark one backend in this process and print the result as JSON."""
+    from scrapers.parser import parse_html
+
+    fixtures = load_fixtures()
+    # Warm up imports and lazy initialisation before measuring
+    parse_html("<html><body><p>warmup</p></body></html>", backend)
+
+    # Memory pass first, while the process peak RSS still reflects only the warmup
+    rss_before = peak_rss_kb()
+    tracemalloc.start()
+    for markup in fixtures.values():
+        extract(parse_html(markup, backend))
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = peak_rss_kb()
+
+    # Timing pass; tracemalloc is off because it slows Python-heavy backends
+    parse_time = 0.0
+    extract_time = 0.0
+    for _ in range(ITERATIONS):
+        for markup in fixtures.values():
+            started = time.perf_counter()
+            soup = parse_html(markup, backend)
+            parse_time += time.perf_counter() - started
+
+            started = time.perf_counter()
+            extract(soup)
+            extract_time += time.perf_counter() - started
+    del soup
+
+    runs = ITERATIONS * len(fixtures)
+    print(json.dumps({
+        "backend": backend,
+        "fixtures": len(fixtures),
+        "bytes": sum(len(markup) for markup in fixtures.values()),
+        "parse_ms": parse_time / runs * 1000,
+        "extract_ms": extract_time / runs * 1000,
+        "python_peak_kb": python_peak // 1024,
+        "rss_growth_kb": (rss_after - rss_before) if rss_before is not None else None,
+    }))
+
+def main():
+    """Run every available backend in its own process so memory is measured separately."""
+    if len(sys.argv) > 2 and sys.argv[1] == "worker":
+        run_worker(sys.argv[2])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "save":
+        save_fixtures(sys.argv[2:])
+        return
+
+    from scrapers.parser import PARSER_BACKENDS, is_backend_available
+
+    print("HTML parser benchmark")
+    print("=" * 78)
+    print(f"{'backend':<12} {'fixtures':>8} {'KB':>8} {'parse ms':>10} {'extract ms':>11} "
+          f"{'py peak KB':>11} {'RSS +KB':>9}")
+    for backend in PARSER_BACKENDS:
+        if not is_backend_available(backend):
+            print(f"{backend:<12} not installed")
+            continue
+        result = subprocess.run(
+            [sys.executable, __file__, "worker", backend],
+            capture_output=True, text=True, cwd=str(PROJECT_ROOT)
+        )
+        if result.returncode != 0:
+            print(f"{backend:<12} failed: {result.stderr.strip().splitlines()[-1:]}")
+            continue
+        row = json.loads(result.stdout.strip().splitlines()[-1])
+        rss = row['rss_growth_kb'] if row['rss_growth_kb'] is not None else "n/a"
+        print(f"{row['backend']:<12} {row['fixtures']:>8} {row['bytes'] // 1024:>8} "
+              f"{row['parse_ms']:>10.2f} {row['extract_ms']:>11.2f} {row['python_peak_kb']:>11} {rss:>9}")
+
+if __name__ == "__main__":
+    main()
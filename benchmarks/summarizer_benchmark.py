@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Summarizer backend benchmark.
+Runs synthetic updates through the summarization pipeline against the local
+fake model server (benchmarks/fake_model_server.py), so no API key or network
+is needed, and reports wall time and requests per backend, mode and concurrency.
+
+Usage:
+    python benchmarks/summarizer_benchmark.py [--updates 40] [--latency 0.3] [--concurrency 1,2,4,8]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Every run must reach the server: no cached summaries, no recordings
+os.environ["SUMMARY_CACHE"] = "false"
+os.environ["HTTP_CASSETTE_MODE"] = "off"
+
+from fake_model_server import start_server
+
+SOURCE_TYPES = ["changelog", "blog", "pricing", "github"]
+
+def generate_updates(count):
+    """Build synthetic updates of varied length and type."""
+    updates = []
+    for i in range(count):
+        source_type = SOURCE_TYPES[i % len(SOURCE_TYPES)]
+        paragraphs = [
+            f"Acme {source_type} update {i}: we launched feature {i} for workflow automation.",
+            f"Feature {i} lets teams connect {i % 7 + 2} new integrations without writing code.",
+            f"Pricing for the Pro plan is now ${20 + i % 5 * 10} per seat per month.",
+        ]
+        paragraphs += [f"Detail {j}: improved performance of step {j} by {j * 3} percent." for j in range(i % 12)]
+        updates.append({'id': str(i), 'content': "\n".join(paragraphs), 'source_type': source_type})
+    return updates
+
+def report(label, started, server, requests_before, count):
+    elapsed = time.perf_counter() - started
+    requests = server.request_count - requests_before if server else 0
+    print(f"{label:<38} {elapsed:7.2f}s {requests:5d} requests {count / elapsed:8.1f} updates/s")
+
+async def summarize_all_async(backend, updates):
+    return await asyncio.gather(*(backend.summarize_async(update) for update in updates))
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarizer backend benchmark")
+    parser.add_argument("--updates", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake server seconds per request")
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+    from summarizer.backends import ExtractiveBackend, OpenAICompatibleBackend
+    from summarizer.summarize import summarize_batch
+
+    updates = generate_updates(args.updates)
+    print(f"{args.updates} updates, fake server at {base_url} ({args.latency}s per request)\n")
+
+    started = time.perf_counter()
+    summarize_batch(updates, backend=ExtractiveBackend())
+    report("extractive (one vectorized pass)", started, None, 0, len(updates))
+
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        backend = OpenAICompatibleBackend(concurrency=concurrency)
+
+        before = server.request_count
+        started = time.perf_counter()
+        for update in updates:
+            backend.summarize(update)
+        report(f"openai sync, one per request, c={concurrency}", started, server, before, len(updates))
+
+        before = server.request_count
+        started = time.perf_counter()
+        asyncio.run(summarize_all_async(backend, updates))
+        report(f"openai async, one per request, c={concurrency}", started, server, before, len(updates))
+
+        before = server.request_count
+        started = time.perf_counter()
+        summarize_batch(updates, backend=backend)
+        report(f"openai batched pipeline, c={concurrency}", started, server, before, len(updates))
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
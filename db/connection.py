@@ -0,0 +1,67 @@
+# db/connection.py
+
+import os
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DB_PATH = "tracker.db"
+
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHED_STATEMENTS = 128
+
+# One connection per thread and database path; sqlite3 connections can't be shared across threads
+_local = threading.local()
+
+def get_busy_timeout():
+    """Milliseconds a write waits for another writer's lock before failing (SQLITE_BUSY_TIMEOUT_MS)."""
+    return max(0, int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", DEFAULT_BUSY_TIMEOUT_MS)))
+
+def get_mmap_size():
+    """Bytes of the database file read through memory mapping; 0 disables it (SQLITE_MMAP_SIZE)."""
+    return max(0, int(os.getenv("SQLITE_MMAP_SIZE", DEFAULT_MMAP_SIZE)))
+
+def get_cached_statements():
+    """Prepared statements kept per connection for reuse (SQLITE_CACHED_STATEMENTS)."""
+    return max(0, int(os.getenv("SQLITE_CACHED_STATEMENTS", DEFAULT_CACHED_STATEMENTS)))
+
+def connect(path=None):
+    """
+    Open a connection with the tracker's pragmas. WAL lets dashboard readers
+    keep reading while the tracker writes, and synchronous=NORMAL is safe
+    under WAL while skipping an fsync per commit.
+    """
+    conn = sqlite3.connect(
+        path or DB_PATH,
+        timeout=get_busy_timeout() / 1000,
+        cached_statements=get_cached_statements()
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={get_busy_timeout()}")
+    conn.execute(f"PRAGMA mmap_size={get_mmap_size()}")
+    return conn
+
+def get_connection(path=None):
+    """
+    Return this thread's connection, opening it on first use. It stays open
+    for the thread's lifetime, so statements are prepared once and reused.
+    """
+    path = path or DB_PATH
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    if path not in connections:
+        connections[path] = connect(path)
+    return connections[path]
+
+def close_connection(path=None):
+    """Close this thread's connection (it is reopened on next use)."""
+    connections = getattr(_local, 'connections', {})
+    conn = connections.pop(path or DB_PATH, None)
+    if conn is not None:
+        conn.close()
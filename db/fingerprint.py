@@ -0,0 +1,99 @@
+# db/fingerprint.py
+
+import hashlib
+import os
+import re
+import unicodedata
+
+def normalize_content(content):
+    """
+    Build the canonical comparison string for a piece of content.
+    Differences in case, whitespace and unicode form don't count as changes.
+    """
+    if not content:
+        return ""
+    text = unicodedata.normalize("NFKC", content)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip().casefold()
+
+def content_hash(content):
+    """Hash the canonical comparison string for a piece of content."""
+    return hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+
+def fingerprint(content):
+    """Return the (comparison_key, content_hash) pair stored with each update."""
+    key = normalize_content(content)
+    return key, hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+SIMHASH_BITS = 64
+
+# Near-duplicate suppression is only reliable on content with enough tokens
+MIN_SIMHASH_TOKENS = 20
+
+# Similarity at or above which a change counts as minor, per source type.
+# None disables suppression for that source type.
+DEFAULT_SIMILARITY_THRESHOLDS = {
+    'changelog': None,
+    'blog': 0.85,
+    'pricing': 0.85,
+    'github': None,
+    # Blog content from feeds holds only new posts, so it is never compared with the last post
+    'feed': None,
+}
+
+def tokenize(text):
+    """Split normalized text into word tokens."""
+    return re.findall(r'\w+', normalize_content(text))
+
+def simhash(content, shingle_size=3):
+    """
+    Compute a 64-bit SimHash over word shingles, returned as a 16-char hex string.
+    Similar texts get hashes with a small Hamming distance.
+    """
+    tokens = tokenize(content)
+    if len(tokens) >= shingle_size:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        shingles = tokens
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    result = 0
+    for bit in range(SIMHASH_BITS):
+        if weights[bit] > 0:
+            result |= 1 << bit
+    return f"{result:016x}"
+
+def simhash_similarity(a, b):
+    """Return the similarity (0.0-1.0) of two SimHash hex strings."""
+    distance = bin(int(a, 16) ^ int(b, 16)).count("1")
+    return 1.0 - distance / SIMHASH_BITS
+
+def get_similarity_threshold(source_type):
+    """
+    Get the near-duplicate threshold for a source type, overridable with
+    SIMILARITY_THRESHOLDS="blog=0.9,pricing=0.95" (use "none" to disable).
+    """
+    thresholds = dict(DEFAULT_SIMILARITY_THRESHOLDS)
+    for item in os.getenv("SIMILARITY_THRESHOLDS", "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            value = value.strip().lower()
+            thresholds[name.strip()] = None if value in ("", "none", "off") else float(value)
+    return thresholds.get(source_type)
+
+def is_minor_change(source_type, content, previous_simhash):
+    """
+    Check whether changed content is a near-duplicate of the previous version
+    and should be recorded without summarizing or notifying.
+    """
+    threshold = get_similarity_threshold(source_type)
+    if threshold is None or not previous_simhash:
+        return False
+    if len(tokenize(content)) < MIN_SIMHASH_TOKENS:
+        return False
+    return simhash_similarity(simhash(content), previous_simhash) >= threshold
@@ -1,16 +1,14 @@
 import sqlite3
-from datetime import datetime
-import os
 from dotenv import load_dotenv
+from db.connection import get_connection
+from db.fingerprint import fingerprint, simhash
 
 # Load environment variables
 load_dotenv()
 
-DB_PATH = "tracker.db"
-
 def init_db():
     """Initialize the database with tables for all competitor update types."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     c = conn.cursor()
     
     # Create table for all competitor updates
@@ -22,10 +20,17 @@ def init_db():
             content TEXT,
             summary TEXT,
             competitor_name TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            comparison_key TEXT,
+            content_hash TEXT,
+            simhash TEXT,
+            is_minor INTEGER DEFAULT 0
         )
     """)
     
+    # Add fingerprint columns to databases created before they existed
+    migrate_fingerprint_columns(c)
+    
     # Create index for faster lookups
     c.execute("""
         CREATE INDEX IF NOT EXISTS idx_source_url 
@@ -37,46 +42,275 @@ def init_db():
         ON competitor_updates(timestamp)
     """)
     
+    # Covering index so the latest fingerprint per source is read from the index alone
+    c.execute("DROP INDEX IF EXISTS idx_source_hash")
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_source_fingerprint 
+        ON competitor_updates(source_url, timestamp, content_hash, simhash)
+    """)
+    
+    # Create table for the latest state of each source, so change detection never scans history
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS source_state (
+            source_url TEXT PRIMARY KEY,
+            content_hash TEXT,
+            simhash TEXT,
+            last_row_id INTEGER,
+            last_checked_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    migrate_source_state(c)
+    
+    # Create table for HTTP validators used by conditional GET requests
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body_hash TEXT,
+            checked_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create table for the selector that last matched per URL and scraper slot
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS selector_memo (
+            url TEXT NOT NULL,
+            slot TEXT NOT NULL,
+            selector TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (url, slot)
+        )
+    """)
+    
+    # Create table for RSS/Atom feeds discovered on blog pages
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS feed_discovery (
+            page_url TEXT PRIMARY KEY,
+            feed_url TEXT,
+            discovered_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Create table for model summaries, keyed by content hash, source type, prompt version and model
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS summary_cache (
+            cache_key TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_summary_cache_used ON summary_cache(last_used_at)")
+    
+    # Create table for the newest release/commit seen per GitHub repo (incremental sync)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS github_sync (
+            repo TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            last_id TEXT,
+            last_date TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (repo, kind)
+        )
+    """)
+    
+    # Create table for the newest entry seen per feed (incremental ingestion)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS feed_state (
+            feed_url TEXT PRIMARY KEY,
+            last_guid TEXT,
+            last_published TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
     conn.commit()
-    conn.close()
 
-def save_update(source_type, source_url, content, summary, competitor_name=None):
-    """Save a competitor update to the database."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def migrate_fingerprint_columns(c):
+    """Add and backfill the fingerprint columns on older databases."""
+    c.execute("PRAGMA table_info(competitor_updates)")
+    columns = [row[1] for row in c.fetchall()]
+    if 'comparison_key' not in columns:
+        c.execute("ALTER TABLE competitor_updates ADD COLUMN comparison_key TEXT")
+    if 'content_hash' not in columns:
+        c.execute("ALTER TABLE competitor_updates ADD COLUMN content_hash TEXT")
+    if 'simhash' not in columns:
+        c.execute("ALTER TABLE competitor_updates ADD COLUMN simhash TEXT")
+    if 'is_minor' not in columns:
+        c.execute("ALTER TABLE competitor_updates ADD COLUMN is_minor INTEGER DEFAULT 0")
+    
+    # Imported here: scrapers import db.models
+    from scrapers.pricing import extract_pricing_info
+    
     c.execute("""
-        INSERT INTO competitor_updates 
-        (source_type, source_url, content, summary, competitor_name) 
-        VALUES (?, ?, ?, ?, ?)
-    """, (source_type, source_url, content, summary, competitor_name))
-    conn.commit()
-    conn.close()
+        SELECT id, source_type, content, comparison_key FROM competitor_updates 
+        WHERE content_hash IS NULL OR simhash IS NULL
+    """)
+    for row_id, source_type, content, comparison_key in c.fetchall():
+        if comparison_key is None and source_type == 'pricing':
+            # Pricing changes are detected on the extracted pricing info, not the page text
+            comparison_key = extract_pricing_info(content)
+        key, digest = fingerprint(comparison_key or content)
+        c.execute("""
+            UPDATE competitor_updates 
+            SET comparison_key = ?, content_hash = ?, simhash = ? 
+            WHERE id = ?
+        """, (key, digest, simhash(key), row_id))
+
+def migrate_source_state(c):
+    """
+    Fill an empty source_state table in older databases: the content hash of each
+    source's latest update, and the SimHash and row of its latest notified one.
+    """
+    c.execute("SELECT 1 FROM source_state LIMIT 1")
+    if c.fetchone():
+        return
+    c.execute("""
+        INSERT INTO source_state (source_url, content_hash, simhash, last_row_id, last_checked_at, last_changed_at)
+        SELECT u.source_url, latest.content_hash, u.simhash, u.id, latest.timestamp, u.timestamp
+        FROM competitor_updates u
+        JOIN competitor_updates latest ON latest.id = (
+            SELECT id FROM competitor_updates 
+            WHERE source_url = u.source_url 
+            ORDER BY timestamp DESC, id DESC LIMIT 1
+        )
+        WHERE u.source_url IS NOT NULL AND u.id = (
+            SELECT id FROM competitor_updates 
+            WHERE source_url = u.source_url AND is_minor = 0 
+            ORDER BY timestamp DESC, id DESC LIMIT 1
+        )
+    """)
+
+def save_update(source_type, source_url, content, summary, competitor_name=None, comparison_key=None, is_minor=False):
+    """
+    Save a competitor update to the database.
+    comparison_key is the text change detection runs on; it defaults to content.
+    Minor (near-duplicate) changes are recorded but left out of digests, and only
+    update the source's content hash; its SimHash stays that of the last notified version.
+    The source's row in source_state is updated in the same transaction.
+    """
+    key, digest = fingerprint(content if comparison_key is None else comparison_key)
+    key_simhash = simhash(key)
+    conn = get_connection()
+    # The connection context commits, or rolls back on error so the shared connection isn't left mid-transaction
+    with conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO competitor_updates 
+            (source_type, source_url, content, summary, competitor_name, comparison_key, content_hash, simhash, is_minor) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (source_type, source_url, content, summary, competitor_name, key, digest, key_simhash, int(is_minor)))
+        row_id = c.lastrowid
+        if source_url is not None and is_minor:
+            # Minor changes keep the last notified version as the similarity baseline,
+            # so a run of small edits can't drift past the threshold unnoticed
+            c.execute("""
+                INSERT INTO source_state (source_url, content_hash, simhash, last_row_id, last_checked_at, last_changed_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT(source_url) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    last_checked_at = CURRENT_TIMESTAMP
+            """, (source_url, digest, key_simhash, row_id))
+        elif source_url is not None:
+            c.execute("""
+                INSERT INTO source_state (source_url, content_hash, simhash, last_row_id, last_checked_at, last_changed_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ON CONFLICT(source_url) DO UPDATE SET
+                    content_hash = excluded.content_hash,
+                    simhash = excluded.simhash,
+                    last_row_id = excluded.last_row_id,
+                    last_checked_at = CURRENT_TIMESTAMP,
+                    last_changed_at = CURRENT_TIMESTAMP
+            """, (source_url, digest, key_simhash, row_id))
+    return row_id
+
+def update_summary(row_id, summary):
+    """Replace the summary of a saved update (e.g. when a late model summary lands)."""
+    conn = get_connection()
+    with conn:
+        conn.execute("""
+            UPDATE competitor_updates SET summary = ? WHERE id = ?
+        """, (summary, row_id))
 
 def get_last_update(source_url):
-    """Get the last update for a specific source URL."""
-    conn = sqlite3.connect(DB_PATH)
+    """Get the content of the last notified update for a specific source URL."""
+    conn = get_connection()
     c = conn.cursor()
     c.execute("""
-        SELECT content FROM competitor_updates 
-        WHERE source_url = ? 
-        ORDER BY timestamp DESC LIMIT 1
+        SELECT u.content FROM source_state s 
+        JOIN competitor_updates u ON u.id = s.last_row_id 
+        WHERE s.source_url = ?
     """, (source_url,))
     row = c.fetchone()
-    conn.close()
     return row[0] if row else None
 
+def get_update_content(row_id):
+    """Get the content of a saved update by row ID."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("""
+        SELECT content FROM competitor_updates WHERE id = ?
+    """, (row_id,))
+    row = c.fetchone()
+    return row[0] if row else None
+
+def get_source_states():
+    """
+    Load the latest state of every source in one query, keyed by source URL:
+    content hash, SimHash, latest row ID and last checked/changed times.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT source_url, content_hash, simhash, last_row_id, last_checked_at, last_changed_at 
+            FROM source_state
+        """)
+        rows = c.fetchall()
+    except sqlite3.OperationalError:
+        # Table doesn't exist yet (init_db not run)
+        rows = []
+    
+    states = {}
+    for row in rows:
+        states[row[0]] = {
+            'content_hash': row[1],
+            'simhash': row[2],
+            'last_row_id': row[3],
+            'last_checked_at': row[4],
+            'last_changed_at': row[5]
+        }
+    return states
+
+def mark_sources_checked(source_urls):
+    """Record that sources were checked and found unchanged."""
+    if not source_urls:
+        return
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.executemany("""
+            UPDATE source_state SET last_checked_at = CURRENT_TIMESTAMP 
+            WHERE source_url = ?
+        """, [(source_url,) for source_url in source_urls])
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Error marking sources as checked: {e}")
+
 def get_weekly_updates():
     """Get all updates from the last week for digest."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     c = conn.cursor()
     c.execute("""
         SELECT source_type, source_url, summary, content, competitor_name, timestamp
         FROM competitor_updates 
-        WHERE timestamp >= datetime('now', '-7 days')
+        WHERE timestamp >= datetime('now', '-7 days') AND COALESCE(is_minor, 0) = 0
         ORDER BY timestamp DESC
     """)
     rows = c.fetchall()
-    conn.close()
     
     updates = []
     for row in rows:
@@ -92,16 +326,15 @@ def get_weekly_updates():
 
 def get_competitor_updates(competitor_name, days=7):
     """Get updates for a specific competitor."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     c = conn.cursor()
     c.execute("""
         SELECT source_type, source_url, summary, timestamp
         FROM competitor_updates 
-        WHERE competitor_name = ? AND timestamp >= datetime('now', '-{} days')
+        WHERE competitor_name = ? AND timestamp >= datetime('now', '-{} days') AND COALESCE(is_minor, 0) = 0
         ORDER BY timestamp DESC
     """.format(days), (competitor_name,))
     rows = c.fetchall()
-    conn.close()
     
     updates = []
     for row in rows:
@@ -111,4 +344,228 @@ def get_competitor_updates(competitor_name, days=7):
             'summary': row[2],
             'timestamp': row[3]
         })
-    return updates 
\ No newline at end of file
+    return updates
+
+def get_http_validators(url):
+    """Get the stored ETag, Last-Modified and body hash for a URL."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT etag, last_modified, body_hash FROM http_cache
+            WHERE url = ?
+        """, (url,))
+        row = c.fetchone()
+    except sqlite3.OperationalError:
+        # Table doesn't exist yet (init_db not run)
+        row = None
+    
+    if not row:
+        return None
+    return {
+        'etag': row[0],
+        'last_modified': row[1],
+        'body_hash': row[2]
+    }
+
+def save_http_validators(url, etag=None, last_modified=None, body_hash=None):
+    """Store the validators returned for a URL."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            INSERT INTO http_cache (url, etag, last_modified, body_hash, checked_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                body_hash = excluded.body_hash,
+                checked_at = CURRENT_TIMESTAMP
+        """, (url, etag, last_modified, body_hash))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Error saving HTTP validators for {url}: {e}")
+
+def get_selector_memo(url, slot):
+    """Get the selector that matched last time for a URL and scraper slot."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT selector FROM selector_memo
+            WHERE url = ? AND slot = ?
+        """, (url, slot))
+        row = c.fetchone()
+    except sqlite3.OperationalError:
+        # Table doesn't exist yet (init_db not run)
+        row = None
+    return row[0] if row else None
+
+def save_selector_memo(url, slot, selector):
+    """Remember the selector that matched for a URL and scraper slot."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            INSERT INTO selector_memo (url, slot, selector, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(url, slot) DO UPDATE SET
+                selector = excluded.selector,
+                updated_at = CURRENT_TIMESTAMP
+        """, (url, slot, selector))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Error saving selector memo for {url}: {e}")
+
+def get_discovered_feed(page_url):
+    """Get the feed URL discovered on a blog page, or None."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT feed_url FROM feed_discovery
+            WHERE page_url = ?
+        """, (page_url,))
+        row = c.fetchone()
+    except sqlite3.OperationalError:
+        # Table doesn't exist yet (init_db not run)
+        row = None
+    return row[0] if row else None
+
+def save_discovered_feed(page_url, feed_url):
+    """Remember the feed URL advertised by a blog page (None forgets it)."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            INSERT INTO feed_discovery (page_url, feed_url, discovered_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(page_url) DO UPDATE SET
+                feed_url = excluded.feed_url,
+                discovered_at = CURRENT_TIMESTAMP
+        """, (page_url, feed_url))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Error saving discovered feed for {page_url}: {e}")
+
+def get_feed_state(feed_url):
+    """Get the newest entry GUID and published timestamp seen for a feed, or None."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT last_guid, last_published FROM feed_state
+            WHERE feed_url = ?
+        """, (feed_url,))
+        row = c.fetchone()
+    except sqlite3.OperationalError:
+        # Table doesn't exist yet (init_db not run)
+        row = None
+    if not row:
+        return None
+    return {'last_guid': row[0], 'last_published': row[1]}
+
+def save_feed_state(feed_url, last_guid, last_published):
+    """Store the newest entry seen for a feed."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            INSERT INTO feed_state (feed_url, last_guid, last_published, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(feed_url) DO UPDATE SET
+                last_guid = excluded.last_guid,
+                last_published = excluded.last_published,
+                updated_at = CURRENT_TIMESTAMP
+        """, (feed_url, last_guid, last_published))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Error saving feed state for {feed_url}: {e}")
+
+def get_github_sync_state(repo, kind):
+    """Get the newest release ID or commit SHA seen for a repo ('owner/name'), or None."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT last_id, last_date FROM github_sync
+            WHERE repo = ? AND kind = ?
+        """, (repo, kind))
+        row = c.fetchone()
+    except sqlite3.OperationalError:
+        # Table doesn't exist yet (init_db not run)
+        row = None
+    if not row:
+        return None
+    return {'last_id': row[0], 'last_date': row[1]}
+
+def save_github_sync_state(repo, kind, last_id, last_date):
+    """Store the newest release ID or commit SHA seen for a repo."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            INSERT INTO github_sync (repo, kind, last_id, last_date, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(repo, kind) DO UPDATE SET
+                last_id = excluded.last_id,
+                last_date = excluded.last_date,
+                updated_at = CURRENT_TIMESTAMP
+        """, (repo, kind, last_id, last_date))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Error saving GitHub sync state for {repo}: {e}")
+
+def get_cached_summary(cache_key, ttl_seconds):
+    """Get a cached summary younger than ttl_seconds, marking it as used. Returns None on a miss."""
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            SELECT summary FROM summary_cache
+            WHERE cache_key = ? AND created_at >= datetime('now', ?)
+        """, (cache_key, f"-{int(ttl_seconds)} seconds"))
+        row = c.fetchone()
+        if row:
+            c.execute("""
+                UPDATE summary_cache SET last_used_at = CURRENT_TIMESTAMP
+                WHERE cache_key = ?
+            """, (cache_key,))
+            conn.commit()
+    except sqlite3.OperationalError:
+        # Table doesn't exist yet (init_db not run)
+        conn.rollback()
+        row = None
+    return row[0] if row else None
+
+def save_cached_summary(cache_key, summary, ttl_seconds, max_entries):
+    """
+    Store a summary, then evict entries older than ttl_seconds and the least
+    recently used entries beyond max_entries.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        c.execute("""
+            INSERT OR REPLACE INTO summary_cache (cache_key, summary, created_at, last_used_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """, (cache_key, summary))
+        c.execute("""
+            DELETE FROM summary_cache WHERE created_at < datetime('now', ?)
+        """, (f"-{int(ttl_seconds)} seconds",))
+        c.execute("""
+            DELETE FROM summary_cache WHERE cache_key NOT IN (
+                SELECT cache_key FROM summary_cache
+                ORDER BY last_used_at DESC, rowid DESC
+                LIMIT ?
+            )
+        """, (int(max_entries),))
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"Error saving cached summary: {e}")
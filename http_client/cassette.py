@@ -0,0 +1,164 @@
+# http_client/cassette.py
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CASSETTE_DIR = "cassettes"
+
+# Bodies are stored decoded, so transfer-level headers no longer apply on replay
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_lock = threading.Lock()
+_cursors = {}
+_recorded_slots = set()
+
+def get_cassette_mode():
+    """Cassette mode from HTTP_CASSETTE_MODE: off, record or replay."""
+    mode = os.getenv("HTTP_CASSETTE_MODE", "off").lower()
+    return mode if mode in ("record", "replay") else "off"
+
+def get_cassette_dir():
+    """Directory holding recorded cassettes (HTTP_CASSETTE_DIR)."""
+    return os.getenv("HTTP_CASSETTE_DIR", DEFAULT_CASSETTE_DIR)
+
+def is_recording():
+    return get_cassette_mode() == "record"
+
+def is_replaying():
+    return get_cassette_mode() == "replay"
+
+def hash_value(value):
+    """Stable hash of a request body or call arguments, used to match recordings."""
+    if value is None:
+        value = b""
+    elif isinstance(value, str):
+        value = value.encode("utf-8")
+    elif not isinstance(value, bytes):
+        value = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+def slot_path(namespace, slot):
+    """One gzipped JSON file per namespace and slot (e.g. 'http' and 'GET https://...')."""
+    name = hashlib.sha256(slot.encode("utf-8")).hexdigest()[:24]
+    return os.path.join(get_cassette_dir(), namespace, f"{name}.json.gz")
+
+def load_slot(namespace, slot):
+    path = slot_path(namespace, slot)
+    if not os.path.exists(path):
+        return []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)["entries"]
+
+def record(namespace, slot, match, payload):
+    """
+    Append an exchange to a slot. The first write to a slot in a recording
+    run replaces what an earlier run recorded there.
+    """
+    path = slot_path(namespace, slot)
+    with _lock:
+        key = (namespace, slot)
+        entries = load_slot(namespace, slot) if key in _recorded_slots else []
+        _recorded_slots.add(key)
+        entries.append({"match": match, "payload": payload})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump({"slot": slot, "entries": entries}, f, separators=(",", ":"))
+
+def replay(namespace, slot, match):
+    """
+    Return the next recorded payload for a slot, preferring one whose match hash
+    is the same (request bodies can differ slightly between runs, e.g. timestamps).
+    Raises LookupError if nothing was recorded.
+    """
+    with _lock:
+        entries = load_slot(namespace, slot)
+        if not entries:
+            raise LookupError(f"No recording for {namespace}: {slot}")
+        used = _cursors.setdefault((namespace, slot), set())
+        unused = [i for i in range(len(entries)) if i not in used]
+        exact = [i for i in unused if entries[i]["match"] == match]
+        if exact or unused:
+            index = (exact or unused)[0]
+        else:
+            # Replayed more often than recorded: keep serving the closest recording
+            matching = [i for i in range(len(entries)) if entries[i]["match"] == match]
+            index = (matching or [len(entries) - 1])[-1]
+        used.add(index)
+        return entries[index]["payload"]
+
+def call(namespace, slot, args, func):
+    """
+    Run a non-HTTP call (e.g. Gemini, SMTP) through the cassette store.
+
+    Record mode runs func and stores its JSON-serializable result (or its error);
+    replay mode returns the stored result, or re-raises the stored error, without calling func.
+    """
+    mode = get_cassette_mode()
+    if mode == "replay":
+        payload = replay(namespace, slot, hash_value(args))
+        if "error" in payload:
+            raise RuntimeError(payload["error"])
+        return payload["result"]
+    if mode == "off":
+        return func()
+
+    try:
+        result = func()
+    except Exception as e:
+        record(namespace, slot, hash_value(args), {"error": str(e)})
+        raise
+    record(namespace, slot, hash_value(args), {"result": result})
+    return result
+
+def serialize_response(resp):
+    return {
+        "status": resp.status_code,
+        "reason": resp.reason,
+        "url": resp.url,
+        "headers": {k: v for k, v in resp.headers.items() if k.lower() not in DROPPED_HEADERS},
+        "body": base64.b64encode(resp.content).decode("ascii"),
+    }
+
+def build_response(request, payload):
+    """Rebuild a requests.Response from a recorded exchange."""
+    resp = requests.Response()
+    resp.status_code = payload["status"]
+    resp.reason = payload["reason"]
+    resp.url = payload["url"]
+    resp.headers = CaseInsensitiveDict(payload["headers"])
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp._content = base64.b64decode(payload["body"])
+    resp._content_consumed = True
+    resp.request = request
+    return resp
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    Transport adapter that records every exchange to the cassette store, or in
+    replay mode serves recorded responses without opening a connection.
+    Redirects are followed by the session, so each hop is its own exchange.
+    """
+
+    def send(self, request, **kwargs):
+        slot = f"{request.method} {request.url}"
+        match = hash_value(request.body)
+        if is_replaying():
+            try:
+                payload = replay("http", slot, match)
+            except LookupError as e:
+                raise requests.ConnectionError(str(e), request=request)
+            return build_response(request, payload)
+
+        resp = super().send(request, **kwargs)
+        if is_recording():
+            # Reading the body here keeps streamed responses iterable afterwards
+            record("http", slot, match, serialize_response(resp))
+        return resp
@@ -0,0 +1,105 @@
+# http_client/session.py
+
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from http_client.cassette import CassetteAdapter, get_cassette_mode
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 10
+
+# Hosts we call many times per run get their own, larger keep-alive pools
+DEFAULT_HOST_POOL_SIZES = {
+    'api.github.com': 20,
+    'api.notion.com': 10,
+    'hooks.slack.com': 5,
+}
+
+# Only permanent redirects are safe to remember between requests
+PERMANENT_REDIRECTS = (301, 308)
+
+_session = None
+_session_lock = threading.Lock()
+_redirects = {}
+_redirects_lock = threading.Lock()
+
+def get_accept_encoding():
+    """Advertise brotli only when urllib3 can decode it."""
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+def get_host_pool_sizes():
+    """
+    Get per-host pool sizes, overridable with
+    HTTP_HOST_POOL_SIZES="api.github.com=20,hooks.slack.com=5".
+    """
+    sizes = dict(DEFAULT_HOST_POOL_SIZES)
+    for item in os.getenv("HTTP_HOST_POOL_SIZES", "").split(","):
+        if "=" in item:
+            host, size = item.split("=", 1)
+            sizes[host.strip().lower()] = int(size)
+    return sizes
+
+def build_session():
+    """
+    Create a session with keep-alive pools sized per host.
+    With HTTP_CASSETTE_MODE=record/replay, every adapter records or replays exchanges.
+    """
+    session = requests.Session()
+    session.headers['Accept-Encoding'] = get_accept_encoding()
+    adapter_class = CassetteAdapter if get_cassette_mode() != "off" else HTTPAdapter
+
+    pool_size = int(os.getenv("HTTP_POOL_SIZE", DEFAULT_POOL_SIZE))
+    default_adapter = adapter_class(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", default_adapter)
+    session.mount("https://", default_adapter)
+
+    for host, size in get_host_pool_sizes().items():
+        session.mount(f"https://{host}/", adapter_class(pool_connections=1, pool_maxsize=size))
+
+    return session
+
+def get_session():
+    """Return the shared session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+def resolve_redirect(url):
+    """Return the cached permanent redirect target for a URL, if any."""
+    with _redirects_lock:
+        return _redirects.get(url, url)
+
+def remember_redirect(url, resp):
+    """Cache the final URL when every hop of a redirect chain was permanent."""
+    if resp.history and all(r.status_code in PERMANENT_REDIRECTS for r in resp.history):
+        with _redirects_lock:
+            _redirects[url] = resp.url
+
+def request(method, url, **kwargs):
+    """
+    Send a request through the shared session.
+    GET requests follow cached permanent redirects directly.
+    """
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    method = method.upper()
+    target = resolve_redirect(url) if method == "GET" else url
+
+    resp = get_session().request(method, target, **kwargs)
+    if method == "GET":
+        remember_redirect(url, resp)
+    return resp
+
+def get(url, **kwargs):
+    """Send a GET request through the shared session."""
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    """Send a POST request through the shared session."""
+    return request("POST", url, **kwargs)
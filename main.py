@@ -6,18 +6,31 @@ Automatically monitors and summarizes competitor updates from multiple sources.
 
 import os
 import sys
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Import scrapers
 from scrapers.changelog import fetch_changelog
-from scrapers.blog import fetch_blog_rss, fetch_blog_html
+from scrapers.blog import fetch_blog, FeedEntries
 from scrapers.pricing import fetch_pricing, extract_pricing_info
-from scrapers.github import fetch_latest_github_release, fetch_github_commits
+from scrapers.github import sync_github_repo, format_github_items
+from scrapers.github_graphql import fetch_github_batch, is_graphql_available
+from scrapers.concurrent_fetch import HostLimiter, interleave_by_host, run_fetch_task, get_max_concurrency
+from scrapers.http_cache import NOT_MODIFIED
+from scrapers.pending_state import collect_state, commit_state
+from scrapers.selector_memo import get_memo_stats
 
 # Import core modules
-from db.models import init_db, save_update, get_last_update, get_weekly_updates
-from summarizer.summarize import summarize_update
+from db.models import init_db, save_update, get_update_content, get_source_states, mark_sources_checked, get_weekly_updates
+from db.fingerprint import content_hash, is_minor_change
+from pipeline.stages import Pipeline, Stage, get_stage_workers, get_batch_wait, get_stats_interval
+from summarizer.summarize import summarize_batch
+from summarizer.prompts import get_batch_max_items
+from summarizer.backends import get_limiter_stats
+from summarizer.routing import get_route_stats
+from summarizer.deadline import wait_for_late_results
+from summarizer.cache import get_cache_stats
 
 # Import notifiers
 from notifier.slack import send_to_slack
@@ -26,10 +39,23 @@ from notifier.notion import send_to_notion, send_to_notion_database
 # Load environment variables
 load_dotenv()
 
+# Source kind labels used in notifications, e.g. "Notion Blog"
+SOURCE_LABELS = {
+    'changelog': 'Changelog',
+    'blog': 'Blog',
+    'pricing': 'Pricing',
+    'github': 'GitHub',
+}
+
 class CompetitorTracker:
     def __init__(self):
         """Initialize the competitor tracker."""
         self.updates_found = []
+        self.updates_lock = threading.Lock()
+        self.host_limiter = HostLimiter()
+        self.pipeline = None
+        self.source_states = {}
+        self.checked_sources = set()
         self.competitors = {
             'techcrunch': {
                 'name': 'TechCrunch',
@@ -45,227 +71,311 @@ class CompetitorTracker:
             }
         }
     
-    def track_changelogs(self):
-        """Track changelog updates from competitors."""
-        print("Tracking changelogs...")
-        
+    def build_fetch_tasks(self):
+        """Fetch tasks for every changelog, blog and pricing source."""
+        tasks = []
         for competitor_id, competitor in self.competitors.items():
             if 'changelog' in competitor:
-                try:
-                    latest_entry = fetch_changelog(competitor['changelog'])
-                    if latest_entry:
-                        last_entry = get_last_update(competitor['changelog'])
-                        
-                        if latest_entry != last_entry:
-                            summary = summarize_update(latest_entry, 'changelog')
-                            save_update(
-                                source_type='changelog',
-                                source_url=competitor['changelog'],
-                                content=latest_entry,
-                                summary=summary,
-                                competitor_name=competitor['name']
-                            )
-                            self.updates_found.append({
-                                'source': f"{competitor['name']} Changelog",
-                                'summary': summary,
-                                'content': latest_entry,
-                                'previous_content': last_entry,
-                                'source_url': competitor['changelog']
-                            })
-                            
-                            print(f"New changelog update from {competitor['name']}")
-                        else:
-                            print(f"No new changelog updates from {competitor['name']}")
-                            
-                except Exception as e:
-                    print(f"Error tracking {competitor['name']} changelog: {e}")
-    
-    def track_blogs(self):
-        """Track blog updates from competitors."""
-        print("Tracking blogs...")
-        
-        for competitor_id, competitor in self.competitors.items():
+                tasks.append({
+                    'key': ('changelog', competitor_id),
+                    'kind': 'changelog',
+                    'competitor': competitor,
+                    'url': competitor['changelog'],
+                    'func': fetch_changelog,
+                    'args': (competitor['changelog'],),
+                    'kwargs': {
+                        'conditional': True,
+                        'rules': competitor.get('normalize'),
+                        'selectors': competitor.get('selectors')
+                    }
+                })
             if 'blog' in competitor:
-                try:
-                    # Try RSS first, then HTML
-                    latest_post = fetch_blog_rss(competitor['blog'])
-                    if not latest_post:
-                        latest_post = fetch_blog_html(competitor['blog'])
-                    
-                    if latest_post:
-                        last_post = get_last_update(competitor['blog'])
-                        
-                        if latest_post != last_post:
-                            summary = summarize_update(latest_post, 'blog')
-                            save_update(
-                                source_type='blog',
-                                source_url=competitor['blog'],
-                                content=latest_post,
-                                summary=summary,
-                                competitor_name=competitor['name']
-                            )
-                            self.updates_found.append({
-                                'source': f"{competitor['name']} Blog",
-                                'summary': summary,
-                                'content': latest_post,
-                                'previous_content': last_post,
-                                'source_url': competitor['blog']
-                            })
-                            
-                            print(f"New blog post from {competitor['name']}")
-                        else:
-                            print(f"No new blog posts from {competitor['name']}")
-                            
-                except Exception as e:
-                    print(f"Error tracking {competitor['name']} blog: {e}")
-    
-    def track_pricing(self):
-        """Track pricing page changes."""
-        print("Tracking pricing changes...")
-        
-        for competitor_id, competitor in self.competitors.items():
+                tasks.append({
+                    'key': ('blog', competitor_id),
+                    'kind': 'blog',
+                    'competitor': competitor,
+                    'url': competitor['blog'],
+                    'func': fetch_blog,
+                    'args': (competitor['blog'],),
+                    'kwargs': {
+                        'conditional': True,
+                        'rules': competitor.get('normalize'),
+                        'selectors': competitor.get('selectors')
+                    }
+                })
             if 'pricing' in competitor:
-                try:
-                    pricing_content = fetch_pricing(competitor['pricing'])
-                    if pricing_content:
-                        pricing_info = extract_pricing_info(pricing_content)
-                        last_pricing = get_last_update(competitor['pricing'])
-                        
-                        if pricing_info != last_pricing:
-                            summary = summarize_update(pricing_info, 'pricing')
-                            save_update(
-                                source_type='pricing',
-                                source_url=competitor['pricing'],
-                                content=pricing_content,
-                                summary=summary,
-                                competitor_name=competitor['name']
-                            )
-                            self.updates_found.append({
-                                'source': f"{competitor['name']} Pricing",
-                                'summary': summary,
-                                'content': pricing_info,
-                                'previous_content': last_pricing,
-                                'source_url': competitor['pricing']
-                            })
-                            
-                            print(f"New pricing update from {competitor['name']}")
-                        else:
-                            print(f"No pricing changes from {competitor['name']}")
-                            
-                except Exception as e:
-                    print(f"Error tracking {competitor['name']} pricing: {e}")
+                tasks.append({
+                    'key': ('pricing', competitor_id),
+                    'kind': 'pricing',
+                    'competitor': competitor,
+                    'url': competitor['pricing'],
+                    'func': fetch_pricing,
+                    'args': (competitor['pricing'],),
+                    'kwargs': {'conditional': True, 'rules': competitor.get('normalize')}
+                })
+        return tasks
     
-    def track_github(self):
-        """Track GitHub releases and commits."""
-        print("Tracking GitHub updates...")
+    def build_github_tasks(self):
+        """
+        Incremental REST sync tasks for every GitHub source. With a token, all
+        repositories are checked in batched GraphQL queries first, and repos the
+        batch shows as unchanged skip their requests.
+        """
+        github_repos = [
+            (competitor['github']['owner'], competitor['github']['repo'])
+            for competitor in self.competitors.values() if 'github' in competitor
+        ]
+        github_batch = {}
+        if github_repos and is_graphql_available():
+            github_batch = fetch_github_batch(github_repos) or {}
         
+        tasks = []
         for competitor_id, competitor in self.competitors.items():
             if 'github' in competitor:
-                try:
-                    github_info = competitor['github']
-                    latest_release = fetch_latest_github_release(
-                        github_info['owner'], 
-                        github_info['repo']
-                    )
-                    
-                    if latest_release:
-                        last_release = get_last_update(f"github://{github_info['owner']}/{github_info['repo']}")
-                        
-                        if latest_release != last_release:
-                            summary = summarize_update(latest_release, 'github')
-                            save_update(
-                                source_type='github',
-                                source_url=f"github://{github_info['owner']}/{github_info['repo']}",
-                                content=latest_release,
-                                summary=summary,
-                                competitor_name=competitor['name']
-                            )
-                            self.updates_found.append({
-                                'source': f"{competitor['name']} GitHub",
-                                'summary': summary,
-                                'content': latest_release,
-                                'previous_content': last_release,
-                                'source_url': f"https://github.com/{github_info['owner']}/{github_info['repo']}/releases"
-                            })
-                            
-                            print(f"New GitHub release from {competitor['name']}")
-                        else:
-                            print(f"No new GitHub releases from {competitor['name']}")
-                            
-                except Exception as e:
-                    print(f"Error tracking {competitor['name']} GitHub: {e}")
+                github_info = competitor['github']
+                repo_key = (github_info['owner'], github_info['repo'])
+                tasks.append({
+                    'key': ('github', competitor_id),
+                    'kind': 'github',
+                    'competitor': competitor,
+                    'url': 'https://api.github.com/',
+                    'source_url': f"github://{github_info['owner']}/{github_info['repo']}",
+                    'func': sync_github_repo,
+                    'args': repo_key,
+                    'kwargs': {'branch': github_info.get('branch'), 'latest': github_batch.get(repo_key)}
+                })
+        return tasks
     
-    def send_notifications(self):
-        """Send notifications for all found updates."""
-        if not self.updates_found:
-            print("No updates to notify about")
+    def iter_sources(self):
+        """Feed the pipeline: web sources interleaved by host, then GitHub repos once the batch query is back."""
+        yield from interleave_by_host(self.build_fetch_tasks())
+        yield from self.build_github_tasks()
+    
+    def build_pipeline(self):
+        """
+        Connect the fetch, parse, detect, summarize, persist and notify stages
+        with bounded queues, each stage with its own worker pool.
+        """
+        return Pipeline([
+            Stage('fetch', self.fetch_stage, workers=get_max_concurrency()),
+            Stage('parse', self.parse_stage, workers=get_stage_workers('parse', 2)),
+            Stage('detect', self.detect_stage, workers=get_stage_workers('detect', 2)),
+            # Changes arriving close together are summarized in one batched request
+            Stage('summarize', self.summarize_stage, workers=get_stage_workers('summarize', 2),
+                  batch_size=get_batch_max_items(), batch_wait=get_batch_wait('summarize', 1.0)),
+            # One writer keeps SQLite inserts from contending with each other
+            Stage('persist', self.persist_stage, workers=get_stage_workers('persist', 1)),
+            Stage('notify', self.notify_stage, workers=get_stage_workers('notify', 2)),
+        ])
+    
+    def fetch_stage(self, task, emit):
+        """
+        Fetch one source, holding its host's slot so no host gets too many requests at once.
+        State the scrapers would save (validators, high-water marks) travels with the
+        change and is committed after persist, so a failed run fetches it again.
+        """
+        with self.host_limiter.limit(task['url']), collect_state() as pending_state:
+            result = run_fetch_task(task)
+        if result is NOT_MODIFIED:
+            print(f"No new {task['kind']} updates from {task['competitor']['name']} (not modified)")
+            commit_state(pending_state)
+            self.mark_checked(task.get('source_url', task['url']))
+            return
+        if result:
+            emit(dict(task, result=result, pending_state=pending_state))
+    
+    def parse_stage(self, fetched, emit):
+        """Turn a fetched source into a change candidate: what to store, compare on, summarize and link to."""
+        kind = fetched['kind']
+        competitor = fetched['competitor']
+        content = fetched['result']
+        candidate = {
+            'source_type': kind,
+            'competitor': competitor,
+            'source_url': fetched['url'],
+            'content': content,
+            'summary_content': content,
+            'comparison_key': None,
+            # Threshold key for near-duplicate detection (see db/fingerprint.py)
+            'similarity_type': 'feed' if isinstance(content, FeedEntries) else kind,
+            'source': f"{competitor['name']} {SOURCE_LABELS[kind]}",
+            'link': fetched['url'],
+            'pending_state': fetched['pending_state'],
+        }
+        if kind == 'pricing':
+            # Compare on the extracted pricing info, which is also stored as the comparison key
+            pricing_info = extract_pricing_info(content)
+            candidate.update(summary_content=pricing_info, comparison_key=pricing_info)
+        elif kind == 'github':
+            owner, repo = fetched['args']
+            content = format_github_items(fetched['result'])
+            candidate.update(
+                source_url=fetched['source_url'],
+                content=content,
+                summary_content=content,
+                link=f"https://github.com/{owner}/{repo}/releases"
+            )
+        emit(candidate)
+    
+    def detect_stage(self, candidate, emit):
+        """Drop unchanged sources, send near-duplicates straight to persist, and new changes on to summarize."""
+        kind = candidate['source_type']
+        name = candidate['competitor']['name']
+        comparison_key = candidate['comparison_key'] or candidate['content']
+        change = self.detect_change(candidate['similarity_type'], candidate['source_url'], comparison_key)
+        if change == 'unchanged':
+            print(f"No new {kind} updates from {name}")
+            commit_state(candidate['pending_state'])
+            self.mark_checked(candidate['source_url'])
             return
-        print(f"Sending notifications for {len(self.updates_found)} updates...")
-        for update in self.updates_found:
-            update_data = {
-                'competitor_name': update['source'].split()[0],
-                'source_type': update['source'].split()[-1].lower(),
-                'summary': update['summary'],
-                'content': update['content'],
-                'previous_content': update.get('previous_content', ''),
-                'source_url': update.get('source_url', '')
+        if change == 'minor':
+            emit(dict(candidate, minor=True), to='persist')
+            return
+        
+        # Previous version for diff-only summaries; pricing diffs the extracted pricing info, not the whole page
+        last = self.source_states.get(candidate['source_url'])
+        last_content = get_update_content(last['last_row_id']) if last else None
+        if kind == 'pricing' and last_content:
+            last_content = extract_pricing_info(last_content)
+        print(f"New {kind} update from {name}")
+        emit(dict(candidate, previous_content=last_content))
+    
+    def summarize_stage(self, changes, emit):
+        """Summarize a batch of changes in batched model requests."""
+        print(f"Summarizing {len(changes)} changes...")
+        # Updates whose model summary misses its deadline get the local summary now
+        # and the model summary backfilled into their rows when it lands
+        late_summaries = {}
+        summaries = summarize_batch([
+            {
+                'id': str(index),
+                'content': change['summary_content'],
+                'source_type': change['source_type'],
+                'previous_content': change['previous_content']
             }
-            # Send to Slack
-            try:
-                from notifier.slack import send_to_slack
-                print("[DEBUG] Sending to Slack...")
-                send_to_slack(None, update_data)
-                print("[DEBUG] Slack notification sent.")
-            except Exception as e:
-                print(f"[ERROR] Failed to send Slack notification: {e}")
-            # Send to Notion
-            try:
-                notion_page_id = os.getenv("NOTION_PAGE_ID")
-                if notion_page_id:
-                    from notifier.notion import send_to_notion
-                    print("[DEBUG] Sending to Notion...")
-                    send_to_notion(
-                        notion_page_id,
-                        f"Competitor Update: {update['source']}",
-                        update['summary'],
-                        update_data=update_data
-                    )
-                    print("[DEBUG] Notion notification sent.")
-                else:
-                    print("[WARN] NOTION_PAGE_ID not set. Skipping Notion notification.")
-            except Exception as e:
-                print(f"[ERROR] Failed to send Notion notification: {e}")
-            # Send to Email
-            try:
-                email_recipient = os.getenv("EMAIL_TO", os.getenv("EMAIL_FROM"))
-                if email_recipient:
-                    from notifier.email import send_email
-                    print("[DEBUG] Sending to Email...")
-                    send_email(
-                        recipient=email_recipient,
-                        subject=f"Competitor Update: {update['source']}",
-                        message=update['summary'],
-                        update_data=update_data
-                    )
-                    print("[DEBUG] Email notification sent.")
-                else:
-                    print("[WARN] EMAIL_TO/EMAIL_FROM not set. Skipping Email notification.")
-            except Exception as e:
-                print(f"[ERROR] Failed to send Email notification: {e}")
-            # Always store the update in SQLite after notifications
-            try:
-                from db.models import save_update
-                print("[DEBUG] Storing update in SQLite DB...")
-                save_update(
-                    source_type=update_data['source_type'],
-                    source_url=update_data['source_url'],
-                    content=update_data['content'],
-                    summary=update_data['summary'],
-                    competitor_name=update_data['competitor_name']
+            for index, change in enumerate(changes)
+        ], late_summaries=late_summaries)
+        for index, change in enumerate(changes):
+            emit(dict(change, summary=summaries[str(index)], late_summary=late_summaries.get(str(index))))
+    
+    def persist_stage(self, change, emit):
+        """Save a change; new changes go on to notification."""
+        if change.get('minor'):
+            self.record_minor_change(
+                change['source_type'], change['source_url'], change['content'], change['competitor'],
+                comparison_key=change['comparison_key']
+            )
+            commit_state(change['pending_state'])
+            return
+        row_id = save_update(
+            source_type=change['source_type'],
+            source_url=change['source_url'],
+            content=change['content'],
+            summary=change['summary'],
+            competitor_name=change['competitor']['name'],
+            comparison_key=change['comparison_key']
+        )
+        commit_state(change['pending_state'])
+        if change['late_summary']:
+            change['late_summary'].attach(row_id)
+        update = {
+            'source': change['source'],
+            'summary': change['summary'],
+            'content': change['summary_content'],
+            'previous_content': change['previous_content'],
+            'source_url': change['link']
+        }
+        with self.updates_lock:
+            self.updates_found.append(update)
+        emit(update)
+    
+    def notify_stage(self, update, emit):
+        """Notify about one saved change while later sources are still being fetched."""
+        self.notify_update(update)
+    
+    def detect_change(self, similarity_type, source_url, comparison_key):
+        """
+        Compare a content fingerprint against the source's state loaded at run start.
+        similarity_type picks the near-duplicate threshold: the source type, or 'feed' for feed entries.
+        Returns 'unchanged', 'minor' (near-duplicate of the last version) or 'new'.
+        """
+        last = self.source_states.get(source_url)
+        if last and content_hash(comparison_key) == last['content_hash']:
+            return 'unchanged'
+        if last and is_minor_change(similarity_type, comparison_key, last['simhash']):
+            return 'minor'
+        return 'new'
+    
+    def mark_checked(self, source_url):
+        """Remember an unchanged source; its last_checked_at is updated once at the end of the run."""
+        with self.updates_lock:
+            self.checked_sources.add(source_url)
+    
+    def record_minor_change(self, source_type, source_url, content, competitor, comparison_key=None):
+        """Record a near-duplicate change without summarizing or notifying."""
+        save_update(
+            source_type=source_type,
+            source_url=source_url,
+            content=content,
+            summary=None,
+            competitor_name=competitor['name'],
+            comparison_key=comparison_key,
+            is_minor=True
+        )
+        print(f"Minor {source_type} change from {competitor['name']} recorded without notification")
+    
+    def notify_update(self, update):
+        """Send one update to Slack, Notion and email. persist_stage has already stored it."""
+        update_data = {
+            'competitor_name': update['source'].split()[0],
+            'source_type': update['source'].split()[-1].lower(),
+            'summary': update['summary'],
+            'content': update['content'],
+            'previous_content': update.get('previous_content', ''),
+            'source_url': update.get('source_url', '')
+        }
+        # Send to Slack
+        try:
+            from notifier.slack import send_to_slack
+            print("[DEBUG] Sending to Slack...")
+            send_to_slack(None, update_data)
+            print("[DEBUG] Slack notification sent.")
+        except Exception as e:
+            print(f"[ERROR] Failed to send Slack notification: {e}")
+        # Send to Notion
+        try:
+            notion_page_id = os.getenv("NOTION_PAGE_ID")
+            if notion_page_id:
+                from notifier.notion import send_to_notion
+                print("[DEBUG] Sending to Notion...")
+                send_to_notion(
+                    notion_page_id,
+                    f"Competitor Update: {update['source']}",
+                    update['summary'],
+                    update_data=update_data
+                )
+                print("[DEBUG] Notion notification sent.")
+            else:
+                print("[WARN] NOTION_PAGE_ID not set. Skipping Notion notification.")
+        except Exception as e:
+            print(f"[ERROR] Failed to send Notion notification: {e}")
+        # Send to Email
+        try:
+            email_recipient = os.getenv("EMAIL_TO", os.getenv("EMAIL_FROM"))
+            if email_recipient:
+                from notifier.email import send_email
+                print("[DEBUG] Sending to Email...")
+                send_email(
+                    recipient=email_recipient,
+                    subject=f"Competitor Update: {update['source']}",
+                    message=update['summary'],
+                    update_data=update_data
                 )
-                print("[DEBUG] Update stored in SQLite DB.")
-            except Exception as e:
-                print(f"[ERROR] Failed to store update in SQLite DB: {e}")
+                print("[DEBUG] Email notification sent.")
+            else:
+                print("[WARN] EMAIL_TO/EMAIL_FROM not set. Skipping Email notification.")
+        except Exception as e:
+            print(f"[ERROR] Failed to send Email notification: {e}")
     
     def run_weekly_digest(self):
         """Generate weekly digest of all updates."""
@@ -316,15 +426,40 @@ class CompetitorTracker:
             self.run_weekly_digest()
             return
         
-        # Track all sources
-        self.track_changelogs()
-        self.track_blogs()
-        self.track_pricing()
-        self.track_github()
+        # Latest state of every source in one query; change detection is a dict lookup
+        self.source_states = get_source_states()
+        
+        # Sources flow through fetch -> parse -> detect -> summarize -> persist -> notify concurrently
+        self.pipeline = self.build_pipeline()
+        self.pipeline.run(self.iter_sources(), stats_interval=get_stats_interval())
+        mark_sources_checked(sorted(self.checked_sources))
+        for stage_name, stage_stats in self.pipeline.get_stats().items():
+            print(f"Pipeline stage {stage_name}: {stage_stats['in']} in, {stage_stats['out']} out, "
+                  f"{stage_stats['errors']} errors, {stage_stats['throughput']:.2f} items/s, "
+                  f"busy {stage_stats['busy_seconds']:.1f}s over {stage_stats['workers']} workers, "
+                  f"max queue depth {stage_stats['max_depth']}")
+        if not self.updates_found:
+            print("No updates to notify about")
         
-        # Send notifications
-        self.send_notifications()
+        landed, still_running = wait_for_late_results()
+        if landed or still_running:
+            print(f"Late model summaries: {landed} backfilled, {still_running} abandoned")
         
+        memo_stats = get_memo_stats()
+        print(f"Selector memo: {memo_stats['hit']} hits, {memo_stats['miss']} misses, "
+              f"{memo_stats['cold']} cold ({memo_stats['hit_rate']:.0%} hit rate)")
+        cache_stats = get_cache_stats()
+        print(f"Summary cache: {cache_stats['hit']} hits, {cache_stats['miss']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate)")
+        for route, route_stats in get_route_stats().items():
+            print(f"Summary route {route} ({route_stats['model']}): {route_stats['updates']} updates in "
+                  f"{route_stats['calls']} calls, {route_stats['mean_latency']:.2f}s mean latency, "
+                  f"~{route_stats['tokens']} tokens, ~${route_stats['cost']:.4f}, "
+                  f"{route_stats['hedged']} past deadline")
+        for backend_name, limiter_stats in get_limiter_stats().items():
+            print(f"Rate limiter ({backend_name}): {limiter_stats['acquired']} requests, {limiter_stats['waited']} waited "
+                  f"{limiter_stats['wait_seconds']:.1f}s total (max {limiter_stats['max_wait']:.1f}s), "
+                  f"{limiter_stats['backoffs']} backoffs")
         print(f"Competitor tracking completed. Found {len(self.updates_found)} updates.")
 
 def run_tracker(email=None):
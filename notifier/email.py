@@ -4,6 +4,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
 from .formatters import MessageFormatter
+from http_client import cassette
 
 load_dotenv()
 
@@ -14,6 +15,19 @@ SMTP_PASS = os.getenv("SMTP_PASS")
 EMAIL_FROM = os.getenv("EMAIL_FROM")
 
 
+def deliver_message(recipient, msg):
+    """
+    Send a prepared MIME message over SMTP.
+    In cassette replay mode the recorded outcome is returned and nothing is sent.
+    """
+    def send():
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
+            server.starttls()
+            server.login(SMTP_USER, SMTP_PASS)
+            server.sendmail(EMAIL_FROM, recipient, msg.as_string())
+        return True
+    return cassette.call('smtp', recipient, msg["Subject"], send)
+
 def send_email(recipient, subject, message, update_data=None):
     """
     Send an email using SMTP with both HTML and plain text content.
@@ -59,10 +73,7 @@ def send_email(recipient, subject, message, update_data=None):
     msg.attach(part2)
 
     try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(EMAIL_FROM, recipient, msg.as_string())
+        deliver_message(recipient, msg)
         try:
             print(f"✅ Email sent to {recipient}")
         except UnicodeEncodeError:
@@ -109,10 +120,7 @@ def send_email_digest(recipient, updates):
     msg.attach(part2)
 
     try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(EMAIL_FROM, recipient, msg.as_string())
+        deliver_message(recipient, msg)
         try:
             print(f"✅ Email digest sent to {recipient}")
         except UnicodeEncodeError:
@@ -1,7 +1,7 @@
 # notifier/notion.py
 
 import os
-import requests
+from http_client import session
 from .formatters import MessageFormatter
 
 def detect_notion_type(notion_id):
@@ -20,7 +20,7 @@ def detect_notion_type(notion_id):
             "Notion-Version": "2022-06-28"
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = session.get(url, headers=headers, timeout=10)
         
         if response.status_code == 200:
             return "page"
@@ -29,7 +29,7 @@ def detect_notion_type(notion_id):
         else:
             # Try as database
             url = f"https://api.notion.com/v1/databases/{notion_id}"
-            response = requests.get(url, headers=headers, timeout=10)
+            response = session.get(url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 return "database"
@@ -130,7 +130,7 @@ def send_to_notion_page(page_id, title, summary):
             ]
         }
         
-        resp = requests.post(url, headers=headers, json=data, timeout=10)
+        resp = session.post(url, headers=headers, json=data, timeout=10)
         
         if resp.status_code == 200:
             print(f"Successfully sent to Notion page: {title}")
@@ -213,7 +213,7 @@ def send_to_notion_database(database_id, title, summary, source_type="changelog"
             }
         }
         
-        resp = requests.post(url, headers=headers, json=data, timeout=10)
+        resp = session.post(url, headers=headers, json=data, timeout=10)
         
         if resp.status_code == 200:
             print(f"Successfully sent to Notion database: {title}")
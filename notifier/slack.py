@@ -1,5 +1,5 @@
 import os
-import requests
+from http_client import session
 from .formatters import MessageFormatter
 
 def send_to_slack(message, update_data=None):
@@ -23,7 +23,7 @@ def send_to_slack(message, update_data=None):
     payload = {"text": message}
     
     try:
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = session.post(webhook_url, json=payload, timeout=10)
         if response.status_code == 200:
             try:
                 print(f"✅ Slack message sent successfully")
@@ -61,7 +61,7 @@ def send_slack_digest(updates):
     payload = {"text": message}
     
     try:
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = session.post(webhook_url, json=payload, timeout=10)
         if response.status_code == 200:
             try:
                 print(f"✅ Slack digest sent successfully")
@@ -0,0 +1,171 @@
+# pipeline/stages.py
+
+import os
+import queue
+import threading
+import time
+
+DEFAULT_QUEUE_SIZE = 32
+
+# Marks the end of a stage's input; each worker consumes one
+_STOP = object()
+
+def get_queue_size():
+    """Items buffered between two stages before upstream workers block (PIPELINE_QUEUE_SIZE)."""
+    return max(1, int(os.getenv("PIPELINE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)))
+
+def get_stage_workers(name, default):
+    """Worker threads for a stage (PIPELINE_<STAGE>_WORKERS)."""
+    return max(1, int(os.getenv(f"PIPELINE_{name.upper()}_WORKERS", default)))
+
+def get_batch_wait(name, default):
+    """Seconds a batching stage waits for more items to fill a batch (PIPELINE_<STAGE>_BATCH_WAIT)."""
+    return max(0.0, float(os.getenv(f"PIPELINE_{name.upper()}_BATCH_WAIT", default)))
+
+def get_stats_interval():
+    """Seconds between queue depth reports while the pipeline runs; 0 disables them (PIPELINE_STATS_INTERVAL)."""
+    return max(0.0, float(os.getenv("PIPELINE_STATS_INTERVAL", 0)))
+
+class Stage:
+    """
+    One pipeline stage: a bounded input queue and a pool of worker threads.
+
+    func(item, emit) processes one item, or with batch_size > 1, func(items, emit)
+    processes up to batch_size items that arrived within batch_wait seconds of
+    each other. emit(item) passes a result to the next stage; emit(item, to=name)
+    sends it to a later stage by name.
+    """
+
+    def __init__(self, name, func, workers=1, batch_size=1, batch_wait=0.0, queue_size=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.queue = queue.Queue(maxsize=queue_size or get_queue_size())
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {'in': 0, 'out': 0, 'errors': 0, 'busy_seconds': 0.0, 'max_depth': 0}
+
+    def put(self, item):
+        """Queue an item, blocking while the stage is full (backpressure)."""
+        self.queue.put(item)
+        with self._lock:
+            self._stats['max_depth'] = max(self._stats['max_depth'], self.queue.qsize())
+
+    def start(self, emit):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(emit,), name=f"{self.name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Signal the end of input and wait for the workers to drain the queue."""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _next_batch(self):
+        """Block for one item, then gather more that arrive within batch_wait. Returns (items, stopped)."""
+        item = self.queue.get()
+        if item is _STOP:
+            return [], True
+        items = [item]
+        deadline = time.monotonic() + self.batch_wait
+        while len(items) < self.batch_size:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _work(self, emit):
+        def counted_emit(item, to=None):
+            with self._lock:
+                self._stats['out'] += 1
+            emit(self, item, to)
+
+        stopped = False
+        while not stopped:
+            items, stopped = self._next_batch()
+            if not items:
+                continue
+            started = time.monotonic()
+            try:
+                self.func(items if self.batch_size > 1 else items[0], counted_emit)
+            except Exception as e:
+                print(f"Error in {self.name} stage: {e}")
+                with self._lock:
+                    self._stats['errors'] += 1
+            with self._lock:
+                self._stats['in'] += len(items)
+                self._stats['busy_seconds'] += time.monotonic() - started
+
+    def get_stats(self, elapsed):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['workers'] = self.workers
+        stats['depth'] = self.queue.qsize()
+        stats['throughput'] = stats['in'] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+class Pipeline:
+    """
+    Linear chain of stages connected by bounded queues. Stages run concurrently,
+    so slow downstream work (summaries, notifications) overlaps with fetching,
+    and full queues make upstream stages wait instead of buffering without limit.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self._by_name = {stage.name: index for index, stage in enumerate(stages)}
+        self._started = None
+        self._finished = None
+
+    def _emit(self, stage, item, to=None):
+        index = self._by_name[stage.name] + 1 if to is None else self._by_name[to]
+        if index <= self._by_name[stage.name]:
+            raise ValueError(f"Stage {stage.name} can only emit to a later stage, not {to}")
+        if index < len(self.stages):
+            self.stages[index].put(item)
+
+    def run(self, source, stats_interval=0):
+        """
+        Feed every item of the source iterable into the first stage and wait until
+        all stages have drained. With stats_interval, queue depths are printed periodically.
+        """
+        self._started = time.monotonic()
+        self._finished = None
+        for stage in self.stages:
+            stage.start(self._emit)
+
+        monitor_done = threading.Event()
+        if stats_interval:
+            threading.Thread(target=self._monitor, args=(stats_interval, monitor_done), daemon=True).start()
+
+        try:
+            for item in source:
+                self.stages[0].put(item)
+        finally:
+            # Stages only emit downstream, so each is drained once everything before it has stopped
+            for stage in self.stages:
+                stage.stop()
+            monitor_done.set()
+            self._finished = time.monotonic()
+
+    def _monitor(self, interval, done):
+        while not done.wait(interval):
+            print("Pipeline queues: " + ", ".join(
+                f"{stage.name} {stage.queue.qsize()}/{stage.queue.maxsize}" for stage in self.stages
+            ))
+
+    def get_stats(self):
+        """Per-stage items in/out, errors, busy time, current and max queue depth and throughput (items/s)."""
+        if self._started is None:
+            return {}
+        elapsed = (self._finished or time.monotonic()) - self._started
+        return {stage.name: stage.get_stats(elapsed) for stage in self.stages}
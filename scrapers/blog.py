@@ -1,79 +1,301 @@
 # scrapers/blog.py
 
 import feedparser
-import requests
-from bs4 import BeautifulSoup
+from requests import HTTPError
+from http_client import session
+from scrapers.parser import parse_html
 import os
+import time
+from urllib.parse import urljoin
+from db.models import get_discovered_feed, save_discovered_feed, get_feed_state, save_feed_state, save_http_validators
+from scrapers.http_cache import conditional_get, NOT_MODIFIED
+from scrapers.pending_state import defer_state
+from scrapers.normalize import normalize_soup, normalize_text
+from scrapers.selector_memo import select_memoized
 
-def fetch_blog_rss(rss_url):
+# Common selectors for blog posts
+BLOG_TITLE_SELECTORS = [
+    "article h1", ".post-title", ".blog-title", 
+    ".entry-title", "h1.post-title", ".article-title",
+    "h1", ".title", ".headline", ".post-header h1"
+]
+
+# Content types served by RSS/Atom feeds
+FEED_CONTENT_TYPES = ["rss", "atom", "rdf", "application/xml", "text/xml"]
+
+# <link type="..."> values used for feed autodiscovery
+FEED_LINK_TYPES = ["application/rss+xml", "application/atom+xml", "application/rdf+xml"]
+
+# Cap on new feed entries returned in one run
+DEFAULT_MAX_NEW_ENTRIES = 10
+
+# HTTP statuses meaning a feed URL is gone for good
+FEED_GONE_STATUSES = [404, 410]
+
+# Returned by fetch_blog_rss when the URL no longer serves a feed
+FEED_GONE = object()
+
+# Selectors for the post summary/excerpt
+BLOG_SUMMARY_SELECTORS = [
+    ".post-excerpt", ".post-summary", ".entry-summary",
+    ".article-excerpt", "p.lead", ".post-content p",
+    ".excerpt", ".summary", ".description"
+]
+
+class FeedEntries(str):
     """
-    Fetch the latest blog post from an RSS feed.
+    Blog content built from newly ingested feed entries rather than a scraped page.
+    Each run's entries are different posts, so near-duplicate suppression is skipped for it.
+    """
+
+def get_max_new_entries():
+    """Maximum number of new feed entries returned per run (FEED_MAX_NEW_ENTRIES)."""
+    return int(os.getenv("FEED_MAX_NEW_ENTRIES", DEFAULT_MAX_NEW_ENTRIES))
+
+def fetch_blog_rss(rss_url, conditional=True):
+    """
+    Fetch the blog posts published since the last run from an RSS/Atom feed.
+
+    Returns the new posts as "title: summary" blocks (newest first), NOT_MODIFIED
+    if the feed is unchanged or has no new posts, FEED_GONE on a 404/410 or a
+    response that isn't a feed, or None if it can't be read right now.
+    Feeds are fetched with conditional GET headers by default.
     """
     try:
-        feed = feedparser.parse(rss_url)
-        if feed.entries:
-            # Return the latest blog post title and summary
-            entry = feed.entries[0]
-            return f"{entry.title}: {entry.summary}"
+        # Fetch through the shared session; feedparser only parses the body
+        if conditional:
+            resp = conditional_get(rss_url, timeout=10)
+            if resp is NOT_MODIFIED:
+                return NOT_MODIFIED
+        else:
+            resp = session.get(rss_url, timeout=10)
+            resp.raise_for_status()
+        if not is_feed_response(resp):
+            print(f"Not a feed: {rss_url}")
+            # Don't let the stored body hash turn the next check into NOT_MODIFIED
+            defer_state(save_http_validators, rss_url)
+            return FEED_GONE
+        return ingest_feed(rss_url, resp.content)
+    except HTTPError as e:
+        print(f"Error fetching RSS from {rss_url}: {e}")
+        if e.response is not None and e.response.status_code in FEED_GONE_STATUSES:
+            return FEED_GONE
         return None
     except Exception as e:
         print(f"Error fetching RSS from {rss_url}: {e}")
         return None
 
-def fetch_blog_html(url):
+def parse_feed(body):
+    """
+    Parse an RSS/Atom body into entry dicts (guid, title, summary, published), newest first.
+    """
+    feed = feedparser.parse(body)
+    entries = []
+    for entry in feed.entries:
+        published = entry.get('published_parsed') or entry.get('updated_parsed')
+        entries.append({
+            'guid': entry.get('id') or entry.get('link') or entry.get('title'),
+            'title': entry.get('title', ''),
+            'summary': entry.get('summary', ''),
+            'published': time.strftime('%Y-%m-%dT%H:%M:%SZ', published) if published else None,
+        })
+    # Most feeds are newest first already; sort when every entry is dated
+    if entries and all(entry['published'] for entry in entries):
+        entries.sort(key=lambda entry: entry['published'], reverse=True)
+    return entries
+
+def select_new_entries(entries, state):
+    """
+    Pick the entries newer than the feed's stored state.
+
+    Dated entries are compared by published timestamp; otherwise entries are
+    taken in feed order until the last-seen GUID. Without state only the
+    latest entry is returned, so a new feed doesn't flood the summary.
+    """
+    if not state:
+        return entries[:1]
+    new_entries = []
+    for entry in entries:
+        if entry['guid'] == state['last_guid']:
+            break
+        if entry['published'] and state['last_published'] and entry['published'] <= state['last_published']:
+            continue
+        new_entries.append(entry)
+    return new_entries
+
+def format_entries(entries):
+    """Render entries as "title: summary" blocks, one per post."""
+    return FeedEntries("\n\n".join(f"{entry['title']}: {entry['summary']}" for entry in entries))
+
+def ingest_feed(feed_url, body):
+    """
+    Return the entries added to a feed since the last run and advance its stored state.
+    Returns NOT_MODIFIED when there is nothing new, or None for an empty/unparseable feed.
+    The new high-water mark is saved through defer_state, so in the pipeline it only
+    moves once the entries are persisted.
+
+    At most FEED_MAX_NEW_ENTRIES are returned. Beyond that the oldest new entries
+    are returned and the mark only moves to the newest of them, so the rest come
+    in on the following runs.
+    """
+    entries = parse_feed(body)
+    if not entries:
+        return None
+    new_entries = select_new_entries(entries, get_feed_state(feed_url))
+    latest = entries[0]
+    max_entries = get_max_new_entries()
+    if len(new_entries) > max_entries:
+        print(f"{len(new_entries) - max_entries} newer feed entries left for the next run: {feed_url}")
+        new_entries = new_entries[-max_entries:]
+        latest = new_entries[0]
+        # Forget the validators so the next run isn't answered with a 304 before reading the rest
+        defer_state(save_http_validators, feed_url)
+    defer_state(save_feed_state, feed_url, latest['guid'], latest['published'])
+    if not new_entries:
+        print(f"No new feed entries: {feed_url}")
+        return NOT_MODIFIED
+    print(f"{len(new_entries)} new feed entries: {feed_url}")
+    return format_entries(new_entries)
+
+def is_feed_response(resp):
+    """
+    Sniff whether a response is an RSS/Atom feed rather than an HTML page.
+    """
+    content_type = resp.headers.get('Content-Type', '').lower()
+    if any(kind in content_type for kind in FEED_CONTENT_TYPES):
+        return True
+    if 'html' in content_type:
+        return False
+    head = resp.content[:1024].lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    return head.startswith((b'<rss', b'<feed', b'<rdf')) or (
+        head.startswith(b'<?xml') and (b'<rss' in head or b'<feed' in head or b'<rdf' in head)
+    )
+
+def find_feed_link(soup, base_url):
+    """
+    Find the RSS/Atom feed advertised by <link rel="alternate"> on an HTML page.
+    """
+    for link in soup.select("link[type]"):
+        rel = link.get('rel') or []
+        if isinstance(rel, str):
+            rel = rel.split()
+        link_type = (link.get('type') or '').lower()
+        if 'alternate' in [r.lower() for r in rel] and link_type in FEED_LINK_TYPES and link.get('href'):
+            return urljoin(base_url, link.get('href'))
+    return None
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def fetch_page(url, conditional=False):
+    """
+    GET a blog URL once. Returns the response, or NOT_MODIFIED when conditional and unchanged.
+    """
+    if conditional:
+        return conditional_get(url, headers=BROWSER_HEADERS, timeout=10)
+    resp = session.get(url, timeout=10, headers=BROWSER_HEADERS)
+    resp.raise_for_status()
+    return resp
+
+def fetch_blog_html(url, conditional=False, rules=None, selectors=None):
     """
     Fetch the latest blog post from an HTML page.
+    With conditional=True, returns NOT_MODIFIED if the page hasn't changed.
+    rules are per-competitor normalization rules (see scrapers/normalize.py).
+    selectors are per-competitor selectors ({'blog_title': [...], 'blog_summary': [...]}),
+    tried first; otherwise the selectors that matched last time are tried first.
     """
     try:
-        resp = requests.get(url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        # Common selectors for blog posts
-        selectors = [
-            "article h1", ".post-title", ".blog-title", 
-            ".entry-title", "h1.post-title", ".article-title",
-            "h1", ".title", ".headline", ".post-header h1"
-        ]
+        resp = fetch_page(url, conditional=conditional)
+        if resp is NOT_MODIFIED:
+            return NOT_MODIFIED
+        return extract_blog_html(parse_html(resp.text), url, rules=rules, selectors=selectors)
+    except Exception as e:
+        print(f"Error fetching blog from {url}: {e}")
+        return None
+
+def extract_blog_html(soup, url, rules=None, selectors=None):
+    """
+    Extract the latest blog post title and summary from a parsed blog page.
+    """
+    normalize_soup(soup, rules)
+
+    selectors = selectors or {}
+    title_elem = select_memoized(
+        soup, url, 'blog_title', BLOG_TITLE_SELECTORS,
+        explicit=selectors.get('blog_title')
+    )
+    if title_elem:
+        title = title_elem.text.strip()
         
-        for selector in selectors:
-            title_elem = soup.select_one(selector)
-            if title_elem:
-                title = title_elem.text.strip()
-                
-                # Try to get summary/excerpt
-                summary_selectors = [
-                    ".post-excerpt", ".post-summary", ".entry-summary",
-                    ".article-excerpt", "p.lead", ".post-content p",
-                    ".excerpt", ".summary", ".description"
-                ]
-                
-                summary = ""
-                for summary_selector in summary_selectors:
-                    summary_elem = soup.select_one(summary_selector)
-                    if summary_elem:
-                        summary = summary_elem.text.strip()
-                        break
-                
-                # If no summary found, try to get first paragraph
-                if not summary:
-                    first_p = soup.select_one("p")
-                    if first_p:
-                        summary = first_p.text.strip()
-                
-                return f"{title}: {summary}" if summary else title
+        # Try to get summary/excerpt
+        summary = ""
+        summary_elem = select_memoized(
+            soup, url, 'blog_summary', BLOG_SUMMARY_SELECTORS,
+            explicit=selectors.get('blog_summary')
+        )
+        if summary_elem:
+            summary = summary_elem.text.strip()
         
-        # Fallback: try to find any meaningful content
-        main_content = soup.find("main") or soup.find("body")
-        if main_content:
-            for element in main_content.find_all(['p', 'div'], limit=5):
-                text = element.get_text(strip=True)
-                if len(text) > 30 and len(text) < 300:
-                    return text
+        # If no summary found, try to get first paragraph
+        if not summary:
+            first_p = soup.select_one("p")
+            if first_p:
+                summary = first_p.text.strip()
         
-        return None
+        return normalize_text(f"{title}: {summary}" if summary else title, rules)
+    
+    # Fallback: try to find any meaningful content
+    main_content = soup.find("main") or soup.find("body")
+    if main_content:
+        for element in main_content.find_all(['p', 'div'], limit=5):
+            text = element.get_text(strip=True)
+            if len(text) > 30 and len(text) < 300:
+                return normalize_text(text, rules)
+    
+    return None
+
+def fetch_blog(url, conditional=False, rules=None, selectors=None):
+    """
+    Fetch new blog posts with a single request to the blog URL.
+
+    The response is sniffed: feeds are ingested incrementally (every post since
+    the last run, see ingest_feed), HTML pages are checked
+    for an advertised RSS/Atom feed (remembered for later runs) and otherwise
+    scraped from the already-downloaded markup.
+    """
+    feed_url = get_discovered_feed(url)
+    if feed_url:
+        latest_post = fetch_blog_rss(feed_url)
+        if latest_post is None:
+            # Transient failure: keep the feed and try it again next run
+            print(f"Discovered feed {feed_url} unavailable, skipping {url} this run")
+            return None
+        if latest_post is not FEED_GONE:
+            return latest_post
+        # Feed went away: forget it and look at the page again
+        print(f"Discovered feed {feed_url} is gone, rechecking {url}")
+        save_discovered_feed(url, None)
+
+    try:
+        resp = fetch_page(url, conditional=conditional)
+        if resp is NOT_MODIFIED:
+            return NOT_MODIFIED
+
+        if is_feed_response(resp):
+            return ingest_feed(url, resp.content)
+
+        soup = parse_html(resp.text)
+        feed_url = find_feed_link(soup, resp.url or url)
+        if feed_url and feed_url != url:
+            latest_post = fetch_blog_rss(feed_url)
+            if latest_post and latest_post is not FEED_GONE:
+                print(f"Discovered feed for {url}: {feed_url}")
+                save_discovered_feed(url, feed_url)
+                return latest_post
+
+        return extract_blog_html(soup, url, rules=rules, selectors=selectors)
     except Exception as e:
         print(f"Error fetching blog from {url}: {e}")
-        return None 
\ No newline at end of file
+        return None
@@ -1,48 +1,98 @@
 # scrapers/changelog.py
 
-import requests
-from bs4 import BeautifulSoup
+from http_client import session
+from scrapers.parser import parse_html
+from scrapers.http_cache import conditional_get, NOT_MODIFIED
+from scrapers.normalize import normalize_soup, normalize_text
+from scrapers.streaming import StreamingExtractor, stream_extract, is_streaming_enabled
+from scrapers.selector_memo import select_memoized, order_selectors
+from db.models import get_selector_memo
 
-def fetch_changelog(url):
+# Multiple selectors for different changelog structures
+CHANGELOG_SELECTORS = [
+    "article h2",                    # Linear style
+    ".changelog-entry h2",           # Generic changelog
+    ".release-note h2",              # Release notes
+    ".update-title",                 # Update titles
+    "h2",                           # Any h2
+    ".changelog h1",                 # Changelog headers
+    ".release h1",                   # Release headers
+    "h1",                           # Any h1
+    ".entry-title",                  # Entry titles
+    ".post-title"                    # Post titles
+]
+
+def fetch_changelog(url, conditional=False, rules=None, streaming=None, selectors=None):
     """
     Fetch the latest changelog entry from a competitor's website.
+    With conditional=True, returns NOT_MODIFIED if the page hasn't changed.
+    rules are per-competitor normalization rules (see scrapers/normalize.py).
+    With streaming=True (default: STREAMING_EXTRACTION), picks the same entry as
+    the DOM path and stops reading the page once the top-priority selector matches.
+    selectors are per-competitor selectors ({'changelog': [...]}), tried first.
     """
     try:
-        resp = requests.get(url, timeout=10, headers={
+        headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        # Multiple selectors for different changelog structures
-        selectors = [
-            "article h2",                    # Linear style
-            ".changelog-entry h2",           # Generic changelog
-            ".release-note h2",              # Release notes
-            ".update-title",                 # Update titles
-            "h2",                           # Any h2
-            ".changelog h1",                 # Changelog headers
-            ".release h1",                   # Release headers
-            "h1",                           # Any h1
-            ".entry-title",                  # Entry titles
-            ".post-title"                    # Post titles
-        ]
+        }
+        if streaming is None:
+            streaming = is_streaming_enabled()
         
-        for selector in selectors:
-            entry = soup.select_one(selector)
-            if entry and entry.text.strip():
-                return entry.text.strip()
+        if streaming:
+            extractor = StreamingExtractor(
+                # The memoized selector goes first so repeat runs can stop early
+                selectors=order_selectors(
+                    CHANGELOG_SELECTORS,
+                    memo=get_selector_memo(url, 'changelog'),
+                    explicit=(selectors or {}).get('changelog')
+                ),
+                rules=rules
+            )
+            result = stream_extract(url, extractor, headers=headers, conditional=conditional)
+            if result is NOT_MODIFIED:
+                return NOT_MODIFIED
+            extractor, markup = result
+            if extractor.match:
+                return normalize_text(extractor.match, rules)
+            # Nothing matched in the streamed part; fall back to the DOM path on what was read
+            soup = parse_html(markup)
+        else:
+            if conditional:
+                resp = conditional_get(url, headers=headers, timeout=10)
+                if resp is NOT_MODIFIED:
+                    return NOT_MODIFIED
+            else:
+                resp = session.get(url, timeout=10, headers=headers)
+                resp.raise_for_status()
+            soup = parse_html(resp.text)
         
-        # If no specific selectors work, try to find any meaningful content
-        main_content = soup.find("main") or soup.find("body")
-        if main_content:
-            # Look for the first meaningful text block
-            for element in main_content.find_all(['p', 'div', 'span'], limit=10):
-                text = element.get_text(strip=True)
-                if len(text) > 20 and len(text) < 500:  # Reasonable length
-                    return text
-        
-        return None
+        return extract_changelog(soup, url, rules, selectors)
     except Exception as e:
         print(f"Error fetching changelog from {url}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def extract_changelog(soup, url, rules=None, selectors=None):
+    """
+    Extract the latest changelog entry from a parsed page.
+    The selector that matched last time for this URL is tried first.
+    """
+    normalize_soup(soup, rules)
+    
+    entry = select_memoized(
+        soup, url, 'changelog', CHANGELOG_SELECTORS,
+        explicit=(selectors or {}).get('changelog'),
+        accept=lambda element: element.text.strip()
+    )
+    if entry:
+        return normalize_text(entry.text, rules)
+    
+    # If no specific selectors work, try to find any meaningful content
+    main_content = soup.find("main") or soup.find("body")
+    if main_content:
+        # Look for the first meaningful text block
+        for element in main_content.find_all(['p', 'div', 'span'], limit=10):
+            text = element.get_text(strip=True)
+            if len(text) > 20 and len(text) < 500:  # Reasonable length
+                return normalize_text(text, rules)
+    
+    return None
\ No newline at end of file
@@ -0,0 +1,63 @@
+# scrapers/concurrent_fetch.py
+
+import os
+import threading
+from urllib.parse import urlparse
+
+# Total number of sources fetched at the same time
+DEFAULT_MAX_CONCURRENCY = 16
+# Number of simultaneous requests allowed against a single host
+DEFAULT_PER_HOST_LIMIT = 4
+
+def get_max_concurrency():
+    """Get the global fetch concurrency limit from the environment."""
+    return max(1, int(os.getenv("FETCH_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)))
+
+def get_per_host_limit():
+    """Get the per-host fetch concurrency limit from the environment."""
+    return max(1, int(os.getenv("FETCH_PER_HOST_LIMIT", DEFAULT_PER_HOST_LIMIT)))
+
+def get_host(url):
+    """Return the host part of a URL, used to group requests per host."""
+    return urlparse(url).netloc.lower() if url else ""
+
+def interleave_by_host(tasks):
+    """
+    Order tasks round-robin across hosts so workers waiting on a busy host
+    don't hold up sources on other hosts.
+    """
+    by_host = {}
+    for task in tasks:
+        by_host.setdefault(get_host(task['url']), []).append(task)
+
+    ordered = []
+    queues = list(by_host.values())
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop(0))
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+class HostLimiter:
+    """Per-host semaphores limiting simultaneous requests against a single host."""
+
+    def __init__(self, per_host_limit=None):
+        self.per_host_limit = per_host_limit or get_per_host_limit()
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def limit(self, url):
+        """Semaphore to hold while requesting url (use as a context manager)."""
+        host = get_host(url)
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._semaphores[host]
+
+def run_fetch_task(task):
+    """Run one fetch task, returning None (after printing the error) if it raises."""
+    try:
+        return task['func'](*task.get('args', ()), **task.get('kwargs', {}))
+    except Exception as e:
+        print(f"Error fetching {task['url']}: {e}")
+        return None
@@ -1,65 +1,186 @@
 # scrapers/github.py
 
-import requests
+from http_client import session
 import os
+from urllib.parse import urlencode
+from db.models import get_github_sync_state, save_github_sync_state
+from scrapers.http_cache import conditional_get, NOT_MODIFIED
+from scrapers.pending_state import defer_state
 
-def fetch_latest_github_release(owner, repo):
+GITHUB_API_URL = "https://api.github.com"
+DEFAULT_PER_PAGE = 30
+DEFAULT_MAX_PAGES = 5
+
+def github_headers():
+    """Request headers for the GitHub API, with the token if available for higher rate limits."""
+    headers = {}
+    github_token = os.getenv("GITHUB_TOKEN")
+    if github_token:
+        headers["Authorization"] = f"token {github_token}"
+    return headers
+
+def get_max_pages():
+    """Maximum number of pages walked per repo and kind in one sync (GITHUB_SYNC_MAX_PAGES)."""
+    return max(1, int(os.getenv("GITHUB_SYNC_MAX_PAGES", DEFAULT_MAX_PAGES)))
+
+def fetch_github_pages(url, params, is_seen, max_pages):
     """
-    Fetch the latest GitHub release using the GitHub API.
+    Page through a GitHub list endpoint (newest first) until the first item already seen.
+
+    The first page is requested with the stored ETag, so an unchanged list costs a
+    304, which GitHub doesn't count against the rate limit.
+    Returns the unseen items, or NOT_MODIFIED.
     """
-    try:
-        url = f"https://api.github.com/repos/{owner}/{repo}/releases/latest"
-        
-        # Add GitHub token if available for higher rate limits
-        headers = {}
-        github_token = os.getenv("GITHUB_TOKEN")
-        if github_token:
-            headers["Authorization"] = f"token {github_token}"
-        
-        resp = requests.get(url, headers=headers, timeout=10)
+    resp = conditional_get(f"{url}?{urlencode(params)}", headers=github_headers(), timeout=10)
+    if resp is NOT_MODIFIED:
+        return NOT_MODIFIED
+
+    items = []
+    for page in range(max_pages):
+        for item in resp.json():
+            if is_seen(item):
+                return items
+            items.append(item)
+        next_url = resp.links.get('next', {}).get('url')
+        if not next_url or page + 1 >= max_pages:
+            break
+        resp = session.get(next_url, headers=github_headers(), timeout=10)
         resp.raise_for_status()
-        
-        data = resp.json()
-        release_name = data.get("name", "")
-        release_body = data.get("body", "")
-        
-        if release_name and release_body:
-            return f"{release_name}: {release_body[:500]}..."
-        elif release_name:
-            return release_name
-        elif release_body:
-            return release_body[:500] + "..."
-        
-        return None
-    except Exception as e:
-        print(f"Error fetching GitHub release for {owner}/{repo}: {e}")
-        return None
+    return items
+
+def sync_github_releases(owner, repo):
+    """
+    Fetch the releases published since the last sync, newest first.
+    Returns a list of release dicts, or NOT_MODIFIED. The first sync returns only the latest release.
+    The sync state isn't advanced here; see save_sync_state.
+    """
+    full_name = f"{owner}/{repo}"
+    state = get_github_sync_state(full_name, 'releases')
+    releases = fetch_github_pages(
+        f"{GITHUB_API_URL}/repos/{full_name}/releases",
+        {'per_page': DEFAULT_PER_PAGE if state else 1},
+        lambda release: bool(state) and str(release.get('id')) == state['last_id'],
+        get_max_pages() if state else 1
+    )
+    if releases is NOT_MODIFIED:
+        return NOT_MODIFIED
+
+    releases = [release for release in releases if not release.get('draft')]
+    if state and state['last_date']:
+        # Also covers the last-seen release having been deleted
+        releases = [release for release in releases if (release.get('published_at') or '') > state['last_date']]
+
+    return [{
+        'kind': 'release',
+        'id': str(release['id']),
+        'name': release.get('name') or release.get('tag_name') or '',
+        'tag': release.get('tag_name'),
+        'body': release.get('body') or '',
+        'url': release.get('html_url'),
+        'date': release.get('published_at'),
+    } for release in releases]
+
+def sync_github_commits(owner, repo, branch=None):
+    """
+    Fetch the commits made since the last-seen SHA, newest first.
+    Returns a list of commit dicts, or NOT_MODIFIED. The first sync returns only the latest commit.
+    The sync state isn't advanced here; see save_sync_state.
+    """
+    full_name = f"{owner}/{repo}"
+    state = get_github_sync_state(full_name, 'commits')
+    params = {'per_page': DEFAULT_PER_PAGE if state else 1}
+    if branch:
+        params['sha'] = branch
+    if state and state['last_date']:
+        # 'since' is inclusive, so the last-seen commit ends the walk
+        params['since'] = state['last_date']
+    commits = fetch_github_pages(
+        f"{GITHUB_API_URL}/repos/{full_name}/commits",
+        params,
+        lambda commit: bool(state) and commit.get('sha') == state['last_id'],
+        get_max_pages() if state else 1
+    )
+    if commits is NOT_MODIFIED:
+        return NOT_MODIFIED
+
+    items = []
+    for commit in commits:
+        details = commit.get('commit', {})
+        items.append({
+            'kind': 'commit',
+            'id': commit.get('sha'),
+            'message': details.get('message', ''),
+            'author': details.get('author', {}).get('name', ''),
+            'url': commit.get('html_url'),
+            'date': details.get('committer', {}).get('date'),
+        })
+    return items
+
+def save_sync_state(owner, repo, releases, commits):
+    """
+    Advance a repo's sync state to the newest release and commit returned by a sync.
+    Saved through defer_state, so in the pipeline it only moves once the items are persisted.
+    """
+    full_name = f"{owner}/{repo}"
+    for kind, items in (('releases', releases), ('commits', commits)):
+        if items and items is not NOT_MODIFIED:
+            defer_state(save_github_sync_state, full_name, kind, items[0]['id'], items[0]['date'])
 
-def fetch_github_commits(owner, repo, branch="main"):
+def is_repo_unchanged(owner, repo, latest, branch=None):
     """
-    Fetch recent commits from a GitHub repository.
+    Check batched GraphQL data (see scrapers/github_graphql.py) against the sync state,
+    so repos whose latest release and commit are already known skip the REST calls.
+    """
+    if not latest or (branch and branch != latest.get('branch')):
+        return False
+    full_name = f"{owner}/{repo}"
+    releases = get_github_sync_state(full_name, 'releases')
+    commits = get_github_sync_state(full_name, 'commits')
+    release = latest.get('release')
+    # GraphQL's latestRelease skips pre-releases, so compare by date as well as ID
+    release_known = release is None or (releases is not None and (
+        str(release['id']) == releases['last_id']
+        or (release['published_at'] or '') <= (releases['last_date'] or '')
+    ))
+    commit_known = not latest.get('head_sha') or (
+        commits is not None and latest['head_sha'] == commits['last_id']
+    )
+    return release_known and commit_known
+
+def sync_github_repo(owner, repo, branch=None, latest=None):
+    """
+    Incrementally sync a repository's releases and commits.
+
+    Args:
+        owner, repo: Repository to sync
+        branch: Branch to read commits from (defaults to the repo's default branch)
+        latest: Optional batched GraphQL data for the repo, used to skip unchanged repos
+
+    Returns:
+        List of new release and commit dicts (releases first), NOT_MODIFIED if
+        there is nothing new, or None on error
     """
     try:
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-        params = {"sha": branch, "per_page": 5}
-        
-        headers = {}
-        github_token = os.getenv("GITHUB_TOKEN")
-        if github_token:
-            headers["Authorization"] = f"token {github_token}"
-        
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
-        resp.raise_for_status()
-        
-        commits = resp.json()
-        if commits:
-            latest_commit = commits[0]
-            commit_message = latest_commit.get("commit", {}).get("message", "")
-            author = latest_commit.get("commit", {}).get("author", {}).get("name", "")
-            
-            return f"Latest commit by {author}: {commit_message}"
-        
-        return None
+        if is_repo_unchanged(owner, repo, latest, branch=branch):
+            print(f"GitHub repo unchanged: {owner}/{repo}")
+            return NOT_MODIFIED
+        releases = sync_github_releases(owner, repo)
+        commits = sync_github_commits(owner, repo, branch=branch)
+        # Only after both calls succeed, so a failed commits call can't lose new releases
+        save_sync_state(owner, repo, releases, commits)
+        items = [item for result in (releases, commits) if result is not NOT_MODIFIED for item in result]
+        return items or NOT_MODIFIED
     except Exception as e:
-        print(f"Error fetching GitHub commits for {owner}/{repo}: {e}")
-        return None 
\ No newline at end of file
+        print(f"Error syncing GitHub repo {owner}/{repo}: {e}")
+        return None
+
+def format_github_items(items):
+    """Render synced releases and commits as text for change detection and summarization."""
+    lines = []
+    for item in items:
+        if item['kind'] == 'release':
+            lines.append(f"Release {item['name']}: {item['body']}".strip())
+        else:
+            headline = item['message'].split('\n', 1)[0]
+            lines.append(f"Commit {item['id'][:7]} by {item['author']}: {headline}")
+    return "\n\n".join(lines)
@@ -0,0 +1,133 @@
+# scrapers/github_graphql.py
+
+import os
+from http_client import session
+
+DEFAULT_GRAPHQL_URL = "https://api.github.com/graphql"
+# Estimated nodes requested per query; 100 keeps each query at GitHub's minimum rate-limit cost
+DEFAULT_MAX_COST = 100
+
+# Only what is_repo_unchanged compares against the sync state: the latest
+# release, the default branch and its head commit
+REPOSITORY_FIELDS = """
+    latestRelease { databaseId publishedAt }
+    defaultBranchRef {
+      name
+      target { ... on Commit { oid } }
+    }
+"""
+
+def get_graphql_url():
+    """GitHub GraphQL endpoint (GITHUB_GRAPHQL_URL), overridable for GitHub Enterprise or a local stub."""
+    return os.getenv("GITHUB_GRAPHQL_URL", DEFAULT_GRAPHQL_URL)
+
+def get_max_cost():
+    """Maximum estimated cost of one batched query (GITHUB_GRAPHQL_MAX_COST)."""
+    return max(1, int(os.getenv("GITHUB_GRAPHQL_MAX_COST", DEFAULT_MAX_COST)))
+
+def is_graphql_available():
+    """The GraphQL API requires authentication, so batching needs GITHUB_TOKEN."""
+    return bool(os.getenv("GITHUB_TOKEN"))
+
+def estimate_repo_cost():
+    """Nodes requested for one repository: the repo, its latest release and its head commit."""
+    return 3
+
+def chunk_repos(repos, max_cost=None):
+    """Split (owner, repo) pairs into chunks whose estimated cost fits in one query."""
+    max_cost = max_cost or get_max_cost()
+    per_chunk = max(1, max_cost // estimate_repo_cost())
+    return [repos[i:i + per_chunk] for i in range(0, len(repos), per_chunk)]
+
+def build_query(repos):
+    """
+    Build one aliased query (r0, r1, ...) for a chunk of repositories.
+    Owners and names are passed as variables rather than interpolated.
+    """
+    declarations = []
+    selections = []
+    variables = {}
+    for index, (owner, repo) in enumerate(repos):
+        declarations.append(f"$owner{index}: String!, $name{index}: String!")
+        selections.append(
+            f"r{index}: repository(owner: $owner{index}, name: $name{index}) {{"
+            f"{REPOSITORY_FIELDS}}}"
+        )
+        variables[f"owner{index}"] = owner
+        variables[f"name{index}"] = repo
+    query = (
+        f"query({', '.join(declarations)}) {{\n"
+        "  rateLimit { cost remaining resetAt }\n"
+        + "\n".join(selections)
+        + "\n}"
+    )
+    return query, variables
+
+def parse_repository(node):
+    """Turn one aliased repository result into its latest release, default branch and head commit."""
+    if not node:
+        return None
+
+    release = node.get("latestRelease")
+    if release:
+        release = {
+            'id': release.get("databaseId"),
+            'published_at': release.get("publishedAt"),
+        }
+
+    branch = node.get("defaultBranchRef") or {}
+    return {
+        'release': release,
+        'branch': branch.get("name"),
+        'head_sha': (branch.get("target") or {}).get("oid"),
+    }
+
+def fetch_github_batch(repos):
+    """
+    Fetch the latest release and default-branch head commit for many repositories
+    with aliased GraphQL queries, chunked by estimated query cost. The results
+    only decide which repos can skip their REST sync (see is_repo_unchanged).
+
+    Args:
+        repos: List of (owner, repo) pairs
+
+    Returns:
+        Dictionary mapping (owner, repo) to its data (None if the repository
+        wasn't found), or None if GraphQL is unavailable or a query failed,
+        so callers can fall back to the REST API.
+    """
+    if not repos or not is_graphql_available():
+        return None
+
+    repos = list(dict.fromkeys(repos))
+    headers = {"Authorization": f"bearer {os.getenv('GITHUB_TOKEN')}"}
+    results = {}
+    try:
+        for chunk in chunk_repos(repos):
+            query, variables = build_query(chunk)
+            resp = session.post(
+                get_graphql_url(),
+                json={"query": query, "variables": variables},
+                headers=headers,
+                timeout=20
+            )
+            resp.raise_for_status()
+            payload = resp.json()
+            data = payload.get("data")
+            if data is None:
+                raise ValueError(payload.get("errors") or "empty GraphQL response")
+            # Missing repositories come back as null with an error entry; the rest are still usable
+            for error in payload.get("errors") or []:
+                print(f"GitHub GraphQL error: {error.get('message', error)}")
+
+            for index, repo_key in enumerate(chunk):
+                results[repo_key] = parse_repository(data.get(f"r{index}"))
+
+            rate_limit = data.get("rateLimit") or {}
+            print(f"GitHub GraphQL: {len(chunk)} repos, cost {rate_limit.get('cost')}, "
+                  f"{rate_limit.get('remaining')} remaining")
+    except Exception as e:
+        print(f"Error fetching GitHub data via GraphQL: {e}")
+        return None
+
+    return results
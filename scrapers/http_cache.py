@@ -0,0 +1,58 @@
+# scrapers/http_cache.py
+
+import hashlib
+from http_client import session
+from db.models import get_http_validators, save_http_validators
+from scrapers.pending_state import defer_state
+
+# Returned by scrapers when the source hasn't changed since the last run
+NOT_MODIFIED = object()
+
+def hash_body(body):
+    """Hash a response body so unchanged pages can be detected without validators."""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return hashlib.sha256(body).hexdigest()
+
+def conditional_headers(url, headers=None):
+    """
+    Build request headers with If-None-Match/If-Modified-Since for a URL.
+    """
+    request_headers = dict(headers or {})
+    validators = get_http_validators(url)
+    if validators:
+        if validators['etag']:
+            request_headers['If-None-Match'] = validators['etag']
+        if validators['last_modified']:
+            request_headers['If-Modified-Since'] = validators['last_modified']
+    return request_headers, validators
+
+def conditional_get(url, headers=None, timeout=10, **kwargs):
+    """
+    GET a URL using the validators stored from the previous run.
+
+    Returns NOT_MODIFIED on a 304 or when the body hash is unchanged,
+    otherwise the response. The new validators are saved through defer_state,
+    so inside collect_state they are only stored once the change is persisted.
+    """
+    request_headers, validators = conditional_headers(url, headers)
+
+    resp = session.get(url, headers=request_headers, timeout=timeout, **kwargs)
+    if resp.status_code == 304:
+        print(f"Not modified: {url}")
+        return NOT_MODIFIED
+    resp.raise_for_status()
+
+    body_hash = hash_body(resp.content)
+    defer_state(
+        save_http_validators,
+        url,
+        etag=resp.headers.get('ETag'),
+        last_modified=resp.headers.get('Last-Modified'),
+        body_hash=body_hash
+    )
+
+    if validators and validators['body_hash'] == body_hash:
+        print(f"Body unchanged: {url}")
+        return NOT_MODIFIED
+    return resp
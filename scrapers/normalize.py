@@ -0,0 +1,86 @@
+# scrapers/normalize.py
+
+import re
+
+# Elements that never carry page content
+NON_CONTENT_TAGS = ["script", "style", "noscript", "template"]
+
+# Markup that changes on every load: CSRF fields, A/B test variants, rotating hero copy
+DEFAULT_DROP_SELECTORS = [
+    "input[type=hidden]",
+    "meta[name=csrf-token]",
+    "[data-optimizely]",
+    "[data-experiment]",
+    "[data-ab-test]",
+    "[data-variant]",
+    "[data-rotate]",
+]
+
+# URL parameters that change on every load: session IDs and cache busters
+VOLATILE_URL_PATTERNS = [
+    r';jsessionid=[^?#\s]+',
+    r'(?<=[?&])(?:sid|sessionid|session_id|phpsessid)=[^&#\s]+&?',
+    r'(?<=[?&])(?:v|ver|_|cb|cachebust|cache_bust|t|ts)=[\w.\-]+&?',
+]
+
+def strip_volatile_params(match):
+    """Remove session IDs and cache busters from a URL found in text."""
+    url = match.group(0)
+    for pattern in VOLATILE_URL_PATTERNS:
+        url = re.sub(pattern, '', url, flags=re.IGNORECASE)
+    # Drop the '?' or '&' left behind when the removed parameter was the last one
+    return re.sub(r'[?&]+(?=#|$)', '', url)
+
+# Text fragments that change on every load, replaced before comparison
+DEFAULT_PATTERNS = [
+    # Relative timestamps: "5 minutes ago", "an hour ago", "just now"
+    (r'\b(?:\d+|an?|one)\s+(?:second|sec|minute|min|hour|hr|day|week|month|year)s?\s+ago\b', ''),
+    (r'\bjust now\b', ''),
+    # CSRF / anti-forgery tokens rendered into text
+    (r'\b(?:csrf|xsrf|authenticity)[_-]?token\b["\'\s:=]+[\w\-+/=]+', ''),
+    # Session IDs and cache busters, only inside URLs so prose like "?t=annual" is kept
+    (r'https?://\S+', strip_volatile_params),
+]
+
+def get_drop_selectors(rules=None):
+    """Default drop selectors plus any per-competitor ones."""
+    rules = rules or {}
+    return DEFAULT_DROP_SELECTORS + list(rules.get('drop_selectors', []))
+
+def get_patterns(rules=None):
+    """Default volatile-text patterns plus any per-competitor ones."""
+    rules = rules or {}
+    extra = [(pattern, '') if isinstance(pattern, str) else tuple(pattern)
+             for pattern in rules.get('patterns', [])]
+    return DEFAULT_PATTERNS + extra
+
+def normalize_soup(soup, rules=None):
+    """
+    Remove non-content and volatile elements from a parsed page in place.
+
+    Args:
+        soup: Parsed document
+        rules: Optional per-competitor rules ('drop_selectors', 'patterns')
+    """
+    for element in soup.find_all(NON_CONTENT_TAGS):
+        element.decompose()
+    for selector in get_drop_selectors(rules):
+        for element in soup.select(selector):
+            element.decompose()
+    return soup
+
+def normalize_text(text, rules=None):
+    """
+    Strip volatile fragments from extracted text and collapse whitespace.
+
+    Args:
+        text: Extracted text
+        rules: Optional per-competitor rules ('drop_selectors', 'patterns')
+    """
+    if not text:
+        return text
+    for pattern, replacement in get_patterns(rules):
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    text = re.sub(r'\n\s*\n', '\n', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
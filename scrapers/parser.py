@@ -0,0 +1,106 @@
+# scrapers/parser.py
+
+import os
+from bs4 import BeautifulSoup
+
+# Fastest first; html.parser is the pure-Python fallback that is always available
+PARSER_BACKENDS = ["selectolax", "lxml", "html.parser"]
+
+def is_backend_available(backend):
+    """Check whether the library behind a parser backend is installed."""
+    try:
+        if backend == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif backend == "lxml":
+            import lxml  # noqa: F401
+        return backend in PARSER_BACKENDS
+    except ImportError:
+        return False
+
+def get_parser_backend():
+    """
+    Pick the parser backend from HTML_PARSER (selectolax, lxml, html.parser or auto).
+    Unavailable backends fall back to the next one in PARSER_BACKENDS.
+    """
+    requested = os.getenv("HTML_PARSER", "auto").lower()
+    candidates = PARSER_BACKENDS
+    if requested in PARSER_BACKENDS:
+        candidates = PARSER_BACKENDS[PARSER_BACKENDS.index(requested):]
+    for backend in candidates:
+        if is_backend_available(backend):
+            return backend
+    return "html.parser"
+
+class LexborNode:
+    """
+    Wraps a selectolax/lexbor node with the subset of the BeautifulSoup API
+    the scrapers use (select_one, select, find, find_all, get_text, text, decompose).
+    """
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def select_one(self, selector):
+        node = self.node.css_first(selector)
+        return LexborNode(node) if node is not None else None
+
+    def select(self, selector):
+        return [LexborNode(node) for node in self.node.css(selector)]
+
+    def find(self, name):
+        return self.select_one(name)
+
+    def find_all(self, names, limit=None):
+        if isinstance(names, str):
+            names = [names]
+        nodes = self.node.css(", ".join(names))
+        if limit:
+            nodes = nodes[:limit]
+        return [LexborNode(node) for node in nodes]
+
+    def __call__(self, names):
+        return self.find_all(names)
+
+    def get(self, attribute, default=None):
+        value = self.node.attributes.get(attribute, default)
+        return default if value is None else value
+
+    def get_text(self, separator="", strip=False):
+        if not strip:
+            return self.node.text(deep=True, separator=separator)
+        # Like BeautifulSoup, drop text nodes that are empty once stripped
+        parts = self.node.text(deep=True, separator="\x00").split("\x00")
+        return separator.join(part.strip() for part in parts if part.strip())
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    def decompose(self):
+        self.node.decompose()
+
+class LexborDocument(LexborNode):
+    """Root of a selectolax/lexbor parse; keeps the parser alive with its nodes."""
+    __slots__ = ("tree",)
+
+    def __init__(self, tree):
+        super().__init__(tree.root)
+        self.tree = tree
+
+def parse_html(markup, backend=None):
+    """
+    Parse HTML with the configured backend.
+
+    Returns a BeautifulSoup document for lxml/html.parser, or a LexborDocument
+    with the same select_one/find/find_all/get_text semantics for selectolax.
+    """
+    backend = backend or get_parser_backend()
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborDocument(LexborHTMLParser(markup))
+    return BeautifulSoup(markup, backend)
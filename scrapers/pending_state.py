@@ -0,0 +1,37 @@
+# scrapers/pending_state.py
+
+import threading
+from contextlib import contextmanager
+
+# State writes collected for the fetch running in this thread (None: write immediately)
+_local = threading.local()
+
+@contextmanager
+def collect_state():
+    """
+    Collect the state writes scrapers make while fetching (HTTP validators, feed
+    and GitHub high-water marks) instead of running them right away.
+
+    Yields the list of pending writes. Pass it to commit_state once the fetched
+    content has been persisted or found unchanged; dropping it leaves the stored
+    state as it was, so the next run fetches the same changes again.
+    """
+    previous = getattr(_local, 'pending', None)
+    _local.pending = pending = []
+    try:
+        yield pending
+    finally:
+        _local.pending = previous
+
+def defer_state(func, *args, **kwargs):
+    """Run a state write, or queue it when called inside collect_state."""
+    pending = getattr(_local, 'pending', None)
+    if pending is None:
+        func(*args, **kwargs)
+    else:
+        pending.append((func, args, kwargs))
+
+def commit_state(pending):
+    """Run collected state writes in the order the scrapers made them."""
+    for func, args, kwargs in pending or []:
+        func(*args, **kwargs)
@@ -1,37 +1,64 @@
 # scrapers/pricing.py
 
-import requests
-from bs4 import BeautifulSoup
+from http_client import session
+from scrapers.parser import parse_html
 import re
+from scrapers.http_cache import conditional_get, NOT_MODIFIED
+from scrapers.normalize import normalize_soup, normalize_text
+from scrapers.streaming import StreamingExtractor, stream_extract, is_streaming_enabled
 
-def fetch_pricing(url):
+# Maximum characters of pricing page text kept for comparison and summarization
+PRICING_TEXT_LIMIT = 2000
+
+def fetch_pricing(url, conditional=False, rules=None, streaming=None):
     """
     Fetch pricing page content to detect pricing changes.
+    With conditional=True, returns NOT_MODIFIED if the page hasn't changed.
+    rules are per-competitor normalization rules (see scrapers/normalize.py).
+    With streaming=True (default: STREAMING_EXTRACTION), stops reading the page
+    once enough text for the truncated output has been collected.
     """
     try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get main content area
-        main_content = soup.find("main") or soup.find("body")
-        if not main_content:
-            return None
+        if streaming is None:
+            streaming = is_streaming_enabled()
         
-        # Extract text content
-        text_content = main_content.get_text(separator="\n", strip=True)
+        if streaming:
+            # Collect extra text so normalization still leaves PRICING_TEXT_LIMIT chars
+            extractor = StreamingExtractor(text_limit=PRICING_TEXT_LIMIT * 2, rules=rules)
+            result = stream_extract(url, extractor, conditional=conditional)
+            if result is NOT_MODIFIED:
+                return NOT_MODIFIED
+            extractor, _ = result
+            text_content = extractor.get_text(separator="\n")
+            if not text_content:
+                return None
+        else:
+            if conditional:
+                resp = conditional_get(url, timeout=10)
+                if resp is NOT_MODIFIED:
+                    return NOT_MODIFIED
+            else:
+                resp = session.get(url, timeout=10)
+                resp.raise_for_status()
+            soup = parse_html(resp.text)
+            
+            # Remove script/style and volatile elements
+            normalize_soup(soup, rules)
+            
+            # Get main content area
+            main_content = soup.find("main") or soup.find("body")
+            if not main_content:
+                return None
+            
+            # Extract text content
+            text_content = main_content.get_text(separator="\n", strip=True)
         
-        # Clean up whitespace
-        text_content = re.sub(r'\n\s*\n', '\n', text_content)
-        text_content = re.sub(r'\s+', ' ', text_content)
+        # Strip volatile text and clean up whitespace
+        text_content = normalize_text(text_content, rules)
         
         # Limit content length to avoid token limits
-        if len(text_content) > 2000:
-            text_content = text_content[:2000] + "..."
+        if len(text_content) > PRICING_TEXT_LIMIT:
+            text_content = text_content[:PRICING_TEXT_LIMIT] + "..."
         
         return text_content
     except Exception as e:
@@ -58,6 +85,7 @@ def extract_pricing_info(content):
         found_pricing.extend(matches)
     
     if found_pricing:
-        return f"Pricing info: {', '.join(set(found_pricing[:5]))}"
+        # Deduplicate in match order; set() ordering changes between runs
+        return f"Pricing info: {', '.join(dict.fromkeys(found_pricing[:5]))}"
     
     return content[:500] + "..." if len(content) > 500 else content 
\ No newline at end of file
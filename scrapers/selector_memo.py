@@ -0,0 +1,61 @@
+# scrapers/selector_memo.py
+
+import threading
+from db.models import get_selector_memo, save_selector_memo
+
+# Memo lookups this process: hit = memoized selector matched,
+# miss = memoized selector stopped matching, cold = no memo yet
+_stats = {'hit': 0, 'miss': 0, 'cold': 0}
+_stats_lock = threading.Lock()
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+def get_memo_stats():
+    """Return memo hit/miss/cold counts and the hit rate for this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = sum(stats.values())
+    stats['hit_rate'] = stats['hit'] / total if total else 0.0
+    return stats
+
+def order_selectors(selectors, memo=None, explicit=None):
+    """Explicit per-source selectors first, then the memoized one, then the defaults."""
+    ordered = []
+    for selector in list(explicit or []) + ([memo] if memo else []) + list(selectors):
+        if selector not in ordered:
+            ordered.append(selector)
+    return ordered
+
+def select_memoized(soup, url, slot, selectors, explicit=None, accept=None):
+    """
+    Return the first element matching the selectors, trying the selector that
+    won last time for this URL first. Falls back to the full list when the
+    memo stops matching, and stores the new winner.
+
+    Args:
+        soup: Parsed page
+        url: Source URL the memo is keyed on
+        slot: Which lookup this is ('changelog', 'blog_title', 'blog_summary')
+        selectors: Default selectors in priority order
+        explicit: Selectors declared in the competitor config, tried first
+        accept: Optional predicate an element must satisfy to count as a match
+    """
+    memo = get_selector_memo(url, slot)
+    for selector in order_selectors(selectors, memo, explicit):
+        element = soup.select_one(selector)
+        if element is not None and (accept is None or accept(element)):
+            if memo is None:
+                _record('cold')
+            elif selector == memo:
+                _record('hit')
+            else:
+                _record('miss')
+            if selector != memo:
+                save_selector_memo(url, slot, selector)
+            return element
+
+    if memo is not None:
+        _record('miss')
+    return None
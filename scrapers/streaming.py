@@ -0,0 +1,264 @@
+# scrapers/streaming.py
+
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+from http_client import session
+from db.models import save_http_validators
+from scrapers.http_cache import conditional_headers, hash_body, NOT_MODIFIED
+from scrapers.pending_state import defer_state
+from scrapers.normalize import NON_CONTENT_TAGS, get_drop_selectors
+
+CHUNK_SIZE = 16 * 1024
+DEFAULT_BYTE_CAP = 1024 * 1024
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+COMPOUND_PATTERN = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:\.[\w-]+|\[[^\]]+\])*)$')
+PART_PATTERN = re.compile(r'\.([\w-]+)|\[\s*([\w-]+)\s*(?:=\s*["\']?([^"\'\]]*)["\']?\s*)?\]')
+
+def is_streaming_enabled():
+    """Check whether scrapers should use streaming extraction (STREAMING_EXTRACTION=true)."""
+    return os.getenv("STREAMING_EXTRACTION", "false").lower() == "true"
+
+def get_byte_cap():
+    """Maximum number of body bytes read in streaming mode."""
+    return int(os.getenv("STREAMING_BYTE_CAP", DEFAULT_BYTE_CAP))
+
+def parse_compound(compound):
+    """Parse 'tag.class[attr=value]' into (tag, classes, attrs). Returns None if unsupported."""
+    match = COMPOUND_PATTERN.match(compound)
+    if not match or not compound:
+        return None
+    tag = match.group("tag")
+    classes = set()
+    attrs = []
+    for class_name, attr, value in PART_PATTERN.findall(match.group("rest")):
+        if class_name:
+            classes.add(class_name)
+        else:
+            attrs.append((attr.lower(), value if value != "" else None))
+    return (tag.lower() if tag and tag != "*" else None, classes, attrs)
+
+def parse_selector(selector):
+    """
+    Parse a simple CSS selector (compounds joined by descendant combinators)
+    into a list of compounds. Returns None for selectors streaming can't evaluate.
+    """
+    compounds = [parse_compound(part) for part in selector.split()]
+    if not compounds or any(compound is None for compound in compounds):
+        return None
+    return compounds
+
+def compound_matches(compound, element):
+    tag, classes, attrs = compound
+    if tag and element['tag'] != tag:
+        return False
+    if classes and not classes <= element['classes']:
+        return False
+    for attr, value in attrs:
+        if attr not in element['attrs']:
+            return False
+        if value is not None and element['attrs'][attr] != value:
+            return False
+    return True
+
+def selector_matches(compounds, stack):
+    """Check the last element on the stack against a descendant-combinator selector."""
+    if not compound_matches(compounds[-1], stack[-1]):
+        return False
+    position = len(stack) - 2
+    for compound in reversed(compounds[:-1]):
+        while position >= 0 and not compound_matches(compound, stack[position]):
+            position -= 1
+        if position < 0:
+            return False
+        position -= 1
+    return True
+
+class StreamingExtractor(HTMLParser):
+    """
+    Incremental HTML tokenizer that stops as soon as it has what a scraper needs.
+
+    selectors: selectors in priority order. match is the text of the first element
+        (in document order) matching the highest-priority selector that matched at
+        all, like trying each selector with select_one in turn. Parsing stops early
+        only once the top-priority selector has matched; otherwise it runs to the
+        end of the stream (or the byte cap) and the best match found is used.
+    text_limit: collect stripped text nodes under <main> (or <body>) until this many
+        characters are available.
+    """
+
+    def __init__(self, selectors=None, text_limit=None, rules=None):
+        super().__init__(convert_charrefs=True)
+        self.selectors = [c for c in (parse_selector(s) for s in selectors or []) if c]
+        self.skip_selectors = [c for c in (parse_selector(s) for s in get_drop_selectors(rules)) if c]
+        self.text_limit = text_limit
+        self.stack = []
+        self.skip_depth = None
+        # Open captures ({'depth', 'index', 'parts'}) and finished matches by selector index
+        self.captures = []
+        self.matches = {}
+        self.pending_text = []
+        self.main_text = []
+        self.body_text = []
+        self.main_length = 0
+        self.body_length = 0
+        self.seen_main = False
+        self.done = False
+
+    @property
+    def match(self):
+        """Text of the best match so far, counting elements still open at the end of the stream."""
+        candidates = dict(self.matches)
+        for capture in self.captures:
+            text = "".join(capture['parts']).strip()
+            if text and capture['index'] not in candidates:
+                candidates[capture['index']] = text
+        return candidates[min(candidates)] if candidates else None
+
+    def claimed(self, index):
+        return index in self.matches or any(capture['index'] == index for capture in self.captures)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        attr_map = {name.lower(): value or "" for name, value in attrs}
+        element = {
+            'tag': tag,
+            'classes': set(attr_map.get('class', "").split()),
+            'attrs': attr_map,
+        }
+        if tag in VOID_TAGS:
+            return
+        self.stack.append(element)
+
+        if self.skip_depth is None:
+            if tag in NON_CONTENT_TAGS or any(selector_matches(s, self.stack) for s in self.skip_selectors):
+                self.skip_depth = len(self.stack)
+                return
+        if tag == "main":
+            self.seen_main = True
+        if self.skip_depth is None:
+            # Only selectors that could still beat the best match so far are worth capturing
+            best = min(self.matches) if self.matches else len(self.selectors)
+            for index in range(best):
+                if not self.claimed(index) and selector_matches(self.selectors[index], self.stack):
+                    self.captures.append({'depth': len(self.stack), 'index': index, 'parts': []})
+                    break
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush_text()
+
+    def handle_endtag(self, tag):
+        self.flush_text()
+        # Pop to the matching open tag; stray end tags are ignored
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index]['tag'] == tag:
+                depth = index + 1
+                if self.skip_depth is not None and depth <= self.skip_depth:
+                    self.skip_depth = None
+                for capture in [c for c in self.captures if c['depth'] >= depth]:
+                    self.captures.remove(capture)
+                    text = "".join(capture['parts']).strip()
+                    # Elements without text don't count, so a later element can still match
+                    if text:
+                        self.matches[capture['index']] = text
+                        if capture['index'] == 0:
+                            self.done = True
+                del self.stack[index:]
+                break
+
+    def handle_data(self, data):
+        if self.skip_depth is not None:
+            return
+        for capture in self.captures:
+            capture['parts'].append(data)
+        if self.text_limit:
+            self.pending_text.append(data)
+
+    def flush_text(self):
+        """Finish the current text node (it may span several chunks)."""
+        if not self.pending_text:
+            return
+        text = "".join(self.pending_text).strip()
+        self.pending_text = []
+        if not text:
+            return
+        tags = [element['tag'] for element in self.stack]
+        if "main" in tags:
+            self.main_text.append(text)
+            self.main_length += len(text) + 1
+            if self.main_length >= self.text_limit:
+                self.done = True
+        elif "body" in tags:
+            self.body_text.append(text)
+            self.body_length += len(text) + 1
+            # Body text is only used on pages without <main>
+            if not self.seen_main and self.body_length >= self.text_limit:
+                self.done = True
+
+    def get_text(self, separator="\n"):
+        """Text under <main> if the page had one, otherwise under <body>."""
+        self.flush_text()
+        return separator.join(self.main_text if self.seen_main else self.body_text)
+
+def stream_extract(url, extractor, headers=None, conditional=False, timeout=10):
+    """
+    Stream a page into an extractor, stopping once it's done or the byte cap is hit.
+
+    Returns (extractor, markup_read), or NOT_MODIFIED when conditional and unchanged.
+    markup_read is the decoded prefix of the body that was consumed.
+    """
+    request_headers = dict(headers or {})
+    validators = None
+    if conditional:
+        request_headers, validators = conditional_headers(url, request_headers)
+
+    resp = session.get(url, headers=request_headers, timeout=timeout, stream=True)
+    try:
+        if resp.status_code == 304:
+            print(f"Not modified: {url}")
+            return NOT_MODIFIED
+        resp.raise_for_status()
+
+        decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+        byte_cap = get_byte_cap()
+        bytes_read = 0
+        markup = []
+        raw = []
+        for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+            bytes_read += len(chunk)
+            raw.append(chunk)
+            text = decoder.decode(chunk)
+            markup.append(text)
+            extractor.feed(text)
+            if extractor.done or bytes_read >= byte_cap:
+                break
+        else:
+            # Whole body read: let the tokenizer process whatever it buffered
+            extractor.close()
+        extractor.flush_text()
+    finally:
+        # Closing early drops the rest of the body instead of downloading it
+        resp.close()
+
+    if conditional:
+        # Extraction only depends on the bytes consumed, so hashing that prefix is enough
+        body_hash = hash_body(b"".join(raw))
+        defer_state(
+            save_http_validators,
+            url,
+            etag=resp.headers.get('ETag'),
+            last_modified=resp.headers.get('Last-Modified'),
+            body_hash=body_hash
+        )
+        if validators and validators['body_hash'] == body_hash:
+            print(f"Body unchanged: {url}")
+            return NOT_MODIFIED
+
+    print(f"Streamed {bytes_read // 1024} KB from {url}")
+    return extractor, "".join(markup)
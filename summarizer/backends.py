@@ -0,0 +1,332 @@
+# summarizer/backends.py
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import google.generativeai as genai
+from http_client import cassette
+from http_client import session
+from summarizer import extractive
+from summarizer.prompts import (
+    build_prompt, build_batch_prompt, pack_batches, parse_batch_response,
+    trim_summary, estimate_tokens
+)
+from summarizer.rate_limit import RateLimiter, parse_retry_delay, is_rate_limit_error
+
+DEFAULT_BACKEND = "gemini"
+DEFAULT_GEMINI_MODEL = "gemini-1.5-pro"
+# Gemini quota; the default of 6 requests per minute is the average rate of the old fixed 10 s spacing
+DEFAULT_GEMINI_RPM = 6
+DEFAULT_GEMINI_TIMEOUT = 60
+DEFAULT_OPENAI_BASE_URL = "http://localhost:8000/v1"
+DEFAULT_OPENAI_MODEL = "local-model"
+DEFAULT_OPENAI_TIMEOUT = 60
+OUTPUT_TOKEN_ESTIMATE = 100  # reserved per request for the response
+
+# Requests in flight at once per backend (<NAME>_CONCURRENCY)
+DEFAULT_CONCURRENCY = {
+    'gemini': 2,
+    'openai': 4,
+    'extractive': 1,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def should_skip_rate_limit_wait():
+    """Check if rate limit waiting should be skipped (always when replaying recorded responses)."""
+    return os.getenv("SKIP_RATE_LIMIT_WAIT", "false").lower() == "true" or cassette.is_replaying()
+
+def get_concurrency(name):
+    """Requests a backend may have in flight at once (GEMINI_CONCURRENCY, OPENAI_CONCURRENCY)."""
+    return max(1, int(os.getenv(f"{name.upper()}_CONCURRENCY", DEFAULT_CONCURRENCY.get(name, 1))))
+
+class SummarizerBackend:
+    """
+    Turns updates into raw summaries. An update is a dict with 'id', 'content',
+    'source_type' and 'is_diff' (content is then a diff, see summarizer/diff.py).
+
+    Every backend offers the same three calls: summarize (sync), summarize_async
+    and summarize_batch. Backends are created once per (name, model) by
+    get_backend and shared by every thread and task of a run.
+    """
+
+    name = None
+    label = None
+    # Local backends run in-process: no prompts, quota, cache or fallback needed
+    local = False
+
+    def __init__(self, model=None, concurrency=None):
+        self.model = model
+        self.concurrency = concurrency or get_concurrency(self.name)
+        self.limiter = None
+        self._semaphores = {}
+        self._semaphores_lock = threading.Lock()
+
+    def is_available(self):
+        """Whether the backend is configured well enough to be called."""
+        return True
+
+    def summarize(self, update):
+        raise NotImplementedError
+
+    async def summarize_async(self, update):
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.summarize, update)
+
+    def summarize_batch(self, updates):
+        """Summarize several updates. Returns {id: summary}; updates left out need a fallback."""
+        return {update['id']: self.summarize(update) for update in updates}
+
+    def _get_semaphore(self):
+        """One asyncio semaphore per event loop, bounding in-flight async calls to the concurrency."""
+        loop = asyncio.get_running_loop()
+        with self._semaphores_lock:
+            if loop not in self._semaphores:
+                self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+            return self._semaphores[loop]
+
+class ModelBackend(SummarizerBackend):
+    """
+    Base for backends that call a language model. Subclasses implement generate
+    (prompt -> text); prompting, quota waits, concurrency and error handling live here.
+    """
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    async def generate_async(self, prompt):
+        """Asyncio version of generate; runs the blocking client call in a worker thread."""
+        return await asyncio.to_thread(self.generate, prompt)
+
+    def wait_for_quota(self, prompt):
+        """Wait for this backend's quota for a prompt. Returns the seconds waited."""
+        # Nothing to wait for when replaying recorded responses
+        if not self.limiter or cassette.is_replaying():
+            return 0.0
+        try:
+            waited = self.limiter.acquire(estimate_tokens(prompt) + OUTPUT_TOKEN_ESTIMATE)
+        except KeyboardInterrupt:
+            print("Rate limit wait skipped by user.")
+            return 0.0
+        if waited > 0:
+            print(f"Rate limiting: Waited {waited:.1f} seconds for {self.label} quota")
+        return waited
+
+    def handle_error(self, e):
+        """
+        Report a failed request. Rate-limit errors slow the backend's limiter down
+        and pause later requests for the server's retry delay, if it sent one.
+        """
+        if is_rate_limit_error(e):
+            print(f"{self.label} rate limit exceeded. Using fallback summarization.")
+            print(f"Error: {e}")
+            retry_after = None if should_skip_rate_limit_wait() else parse_retry_delay(e)
+            if self.limiter:
+                self.limiter.backoff(retry_after)
+            if retry_after:
+                print(f"Rate limit detected. Pausing {self.label} requests for {retry_after:.0f} seconds.")
+            elif should_skip_rate_limit_wait():
+                print("Rate limit wait skipped via SKIP_RATE_LIMIT_WAIT environment variable.")
+        else:
+            print(f"Error summarizing with {self.label}: {e}")
+            print("Using fallback summarization.")
+
+    def complete(self, prompt):
+        """Send one prompt within quota. Errors are reported, then re-raised."""
+        self.wait_for_quota(prompt)
+        try:
+            text = self.generate(prompt)
+        except Exception as e:
+            self.handle_error(e)
+            raise
+        if self.limiter:
+            self.limiter.record_success()
+        return text
+
+    async def complete_async(self, prompt):
+        async with self._get_semaphore():
+            if self.limiter and not cassette.is_replaying():
+                await self.limiter.acquire_async(estimate_tokens(prompt) + OUTPUT_TOKEN_ESTIMATE)
+            try:
+                text = await self.generate_async(prompt)
+            except Exception as e:
+                self.handle_error(e)
+                raise
+        if self.limiter:
+            self.limiter.record_success()
+        return text
+
+    def complete_many(self, prompts):
+        """Send prompts with up to `concurrency` in flight. Returns texts, or the exception for failed prompts."""
+        def run(prompt):
+            try:
+                return self.complete(prompt)
+            except Exception as e:
+                return e
+
+        if self.concurrency == 1 or len(prompts) <= 1:
+            return [run(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(prompts))) as executor:
+            return list(executor.map(run, prompts))
+
+    def summarize(self, update):
+        text = self.complete(build_prompt(update['content'], update.get('source_type', 'update'), update.get('is_diff')))
+        return trim_summary(text) if text else None
+
+    async def summarize_async(self, update):
+        prompt = build_prompt(update['content'], update.get('source_type', 'update'), update.get('is_diff'))
+        text = await self.complete_async(prompt)
+        return trim_summary(text) if text else None
+
+    def summarize_batch(self, updates):
+        batches = pack_batches(updates)
+        print(f"Summarizing {len(updates)} updates in {len(batches)} {self.label} requests "
+              f"({min(self.concurrency, len(batches))} at a time)")
+        responses = self.complete_many([build_batch_prompt(batch) for batch in batches])
+
+        summaries = {}
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                continue
+            parsed = parse_batch_response(response, [update['id'] for update in batch])
+            for update_id, summary in parsed.items():
+                summaries[update_id] = trim_summary(summary)
+        return summaries
+
+class GeminiBackend(ModelBackend):
+    """Google Gemini through google.generativeai; the model client is built once and reused."""
+
+    name = "gemini"
+    label = "Gemini"
+
+    def __init__(self, model=None, concurrency=None):
+        super().__init__(model or os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL), concurrency)
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        self.client = genai.GenerativeModel(self.model)
+        # Requests abandoned at the summarization deadline still end within this time
+        self.timeout = float(os.getenv("GEMINI_TIMEOUT", DEFAULT_GEMINI_TIMEOUT))
+        # Shared by every thread and task that calls Gemini (GEMINI_RPM / GEMINI_TPM)
+        self.limiter = RateLimiter(
+            rpm=float(os.getenv("GEMINI_RPM", DEFAULT_GEMINI_RPM)),
+            tpm=float(os.getenv("GEMINI_TPM", 0)) or None
+        )
+
+    def is_available(self):
+        # Replays need no key
+        return bool(os.getenv("GEMINI_API_KEY")) or cassette.is_replaying()
+
+    def generate(self, prompt):
+        """
+        Call Gemini and return the response text.
+        Recorded and replayed like HTTP exchanges when HTTP_CASSETTE_MODE is set.
+        """
+        return cassette.call('gemini', self.model, prompt, lambda: self.client.generate_content(
+            prompt, request_options={"timeout": self.timeout}
+        ).text)
+
+    async def generate_async(self, prompt):
+        # The cassette store is synchronous, so recorded runs use the threaded path
+        if cassette.get_cassette_mode() != "off":
+            return await super().generate_async(prompt)
+        response = await self.client.generate_content_async(prompt, request_options={"timeout": self.timeout})
+        return response.text
+
+class OpenAICompatibleBackend(ModelBackend):
+    """
+    Any server speaking the OpenAI chat completions API (OPENAI_BASE_URL), such as
+    a local inference server. Requests go through the shared keep-alive session,
+    so they are recorded and replayed with HTTP_CASSETTE_MODE like other HTTP traffic.
+    """
+
+    name = "openai"
+    label = "OpenAI-compatible model"
+
+    def __init__(self, model=None, concurrency=None):
+        super().__init__(model or os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL), concurrency)
+        self.base_url = os.getenv("OPENAI_BASE_URL", DEFAULT_OPENAI_BASE_URL).rstrip("/")
+        self.timeout = float(os.getenv("OPENAI_TIMEOUT", DEFAULT_OPENAI_TIMEOUT))
+        self.headers = {}
+        if os.getenv("OPENAI_API_KEY"):
+            self.headers["Authorization"] = f"Bearer {os.getenv('OPENAI_API_KEY')}"
+        # Local servers usually have no quota (OPENAI_RPM=0)
+        rpm = float(os.getenv("OPENAI_RPM", 0))
+        if rpm:
+            self.limiter = RateLimiter(rpm=rpm, tpm=float(os.getenv("OPENAI_TPM", 0)) or None)
+
+    def generate(self, prompt):
+        resp = session.post(
+            f"{self.base_url}/chat/completions",
+            json={
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.2,
+            },
+            headers=self.headers,
+            timeout=self.timeout
+        )
+        resp.raise_for_status()
+        choices = resp.json().get("choices") or []
+        if not choices:
+            return None
+        return (choices[0].get("message") or {}).get("content")
+
+class ExtractiveBackend(SummarizerBackend):
+    """The in-process extractive summarizer (summarizer/extractive.py); batches are scored in one pass."""
+
+    name = "extractive"
+    label = "Extractive summarizer"
+    local = True
+
+    def __init__(self, model=None, concurrency=None):
+        super().__init__(model or "extractive", concurrency)
+
+    def summarize(self, update):
+        return self.summarize_batch([update])[update['id']]
+
+    def summarize_batch(self, updates):
+        summaries = extractive.simple_summarize_batch(
+            [(update['content'], update.get('source_type', 'update')) for update in updates]
+        )
+        return {update['id']: summary for update, summary in zip(updates, summaries)}
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'openai': OpenAICompatibleBackend,
+    'extractive': ExtractiveBackend,
+}
+
+def get_backend_name():
+    """
+    Configured backend (SUMMARIZER_BACKEND: gemini, openai or extractive).
+    DISABLE_GEMINI_API=true keeps its old meaning of summarizing without Gemini.
+    """
+    name = os.getenv("SUMMARIZER_BACKEND", DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        print(f"Unknown SUMMARIZER_BACKEND '{name}'. Using {DEFAULT_BACKEND}.")
+        name = DEFAULT_BACKEND
+    if name == "gemini" and os.getenv("DISABLE_GEMINI_API", "false").lower() == "true":
+        return "extractive"
+    return name
+
+def get_backend(name=None, model=None):
+    """Return the shared backend instance for a name and model, creating it on first use."""
+    name = name or get_backend_name()
+    with _backends_lock:
+        key = (name, model)
+        if key not in _backends:
+            backend = BACKENDS[name](model=model)
+            # The default model and the same model asked for by name share one instance (and quota)
+            _backends[key] = _backends.setdefault((name, backend.model), backend)
+        return _backends[key]
+
+def get_limiter_stats():
+    """Rate limiter counters of every backend created so far, keyed by 'name:model'."""
+    with _backends_lock:
+        backends = list(dict.fromkeys(_backends.values()))
+    return {
+        f"{backend.name}:{backend.model}": backend.limiter.get_stats()
+        for backend in backends
+        if backend.limiter
+    }
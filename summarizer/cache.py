@@ -0,0 +1,62 @@
+# summarizer/cache.py
+
+import hashlib
+import os
+import threading
+from db.fingerprint import content_hash
+from db.models import get_cached_summary, save_cached_summary
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 1000
+
+# Cache lookups this process
+_stats = {'hit': 0, 'miss': 0}
+_stats_lock = threading.Lock()
+
+def is_cache_enabled():
+    """Check whether model summaries are cached (SUMMARY_CACHE, on by default)."""
+    return os.getenv("SUMMARY_CACHE", "true").lower() == "true"
+
+def get_ttl_seconds():
+    """Age after which cached summaries expire (SUMMARY_CACHE_TTL_DAYS)."""
+    return float(os.getenv("SUMMARY_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS)) * 86400
+
+def get_max_entries():
+    """Maximum number of cached summaries kept (SUMMARY_CACHE_MAX_ENTRIES)."""
+    return int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+def get_cache_stats():
+    """Return cache hit/miss counts and the hit rate for this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats['hit'] + stats['miss']
+    stats['hit_rate'] = stats['hit'] / total if total else 0.0
+    return stats
+
+def cache_key(content, source_type, prompt_version, model):
+    """
+    Key a summary on the normalized content hash, so reverts, flip-flopping pages
+    and the same text reached through several URLs share one entry.
+    """
+    parts = "\x00".join([content_hash(content), source_type or "", str(prompt_version), model])
+    return hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+def get_summary(content, source_type, prompt_version, model):
+    """Return the cached summary for this content, or None (counted as a miss)."""
+    if not is_cache_enabled():
+        return None
+    summary = get_cached_summary(cache_key(content, source_type, prompt_version, model), get_ttl_seconds())
+    with _stats_lock:
+        _stats['hit' if summary is not None else 'miss'] += 1
+    return summary
+
+def save_summary(content, source_type, prompt_version, model, summary):
+    """Cache a model summary and evict expired or least recently used entries."""
+    if not is_cache_enabled() or not summary:
+        return
+    save_cached_summary(
+        cache_key(content, source_type, prompt_version, model),
+        summary,
+        get_ttl_seconds(),
+        get_max_entries()
+    )
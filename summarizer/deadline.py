@@ -0,0 +1,140 @@
+# summarizer/deadline.py
+
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from db.models import update_summary
+
+DEFAULT_DEADLINE_SECONDS = 30
+DEFAULT_HEDGE_AFTER_SECONDS = 10
+DEFAULT_LATE_GRACE_SECONDS = 10
+
+# Late model calls still running, so a run can give them a moment to land before exiting
+_late = []
+_late_lock = threading.Lock()
+
+def get_deadline():
+    """Seconds a summarization call may take before the local summary is used (SUMMARY_DEADLINE_SECONDS)."""
+    return float(os.getenv("SUMMARY_DEADLINE_SECONDS", DEFAULT_DEADLINE_SECONDS))
+
+def get_hedge_after():
+    """Seconds after which the local summary is started in parallel (SUMMARY_HEDGE_AFTER_SECONDS)."""
+    return min(get_deadline(), float(os.getenv("SUMMARY_HEDGE_AFTER_SECONDS", DEFAULT_HEDGE_AFTER_SECONDS)))
+
+def get_late_grace():
+    """Seconds a run waits at the end for late model summaries to be backfilled (SUMMARY_LATE_GRACE_SECONDS)."""
+    return float(os.getenv("SUMMARY_LATE_GRACE_SECONDS", DEFAULT_LATE_GRACE_SECONDS))
+
+def run_in_daemon(func):
+    """
+    Run func in a daemon thread and return a Future for its result.
+    Daemon threads never keep the process alive, so a stuck request can't block exit.
+    """
+    future = Future()
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def run_hedged(primary, fallback, on_late=None, deadline=None, hedge_after=None):
+    """
+    Run a model call with a deadline, hedged by a local fallback.
+
+    primary runs in a daemon thread. If it hasn't finished after hedge_after
+    seconds, fallback starts in parallel so its result is ready when needed.
+    The model result is used if it arrives by the deadline; otherwise, or if the
+    model call fails, the fallback result is. A model result arriving after the
+    deadline is passed to on_late from the model's thread.
+
+    Returns (result, used_primary).
+    """
+    deadline = get_deadline() if deadline is None else deadline
+    hedge_after = get_hedge_after() if hedge_after is None else hedge_after
+    started = time.monotonic()
+
+    primary_future = run_in_daemon(primary)
+    wait([primary_future], timeout=hedge_after)
+    if not primary_future.done():
+        fallback_future = run_in_daemon(fallback)
+        wait([primary_future], timeout=max(0.0, deadline - (time.monotonic() - started)))
+    else:
+        fallback_future = None
+
+    if primary_future.done() and primary_future.exception() is None:
+        return primary_future.result(), True
+
+    if not primary_future.done():
+        print(f"Model call missed the {deadline:.0f}s deadline. Using local summary.")
+        if on_late:
+            track_late(primary_future, on_late)
+    if fallback_future is None:
+        return fallback(), False
+    return fallback_future.result(), False
+
+def track_late(future, on_late):
+    """Hand a late result to on_late when it lands, and remember the call for wait_for_late_results."""
+    done = Future()
+
+    def callback(finished):
+        try:
+            if finished.exception() is None:
+                on_late(finished.result())
+        except Exception as e:
+            print(f"Error handling late summary: {e}")
+        finally:
+            done.set_result(None)
+
+    with _late_lock:
+        _late.append(done)
+    future.add_done_callback(callback)
+
+def wait_for_late_results(timeout=None):
+    """
+    Wait up to timeout seconds for late model calls to land.
+    Returns (landed, still_running) counts; unfinished calls are abandoned at exit.
+    """
+    timeout = get_late_grace() if timeout is None else timeout
+    with _late_lock:
+        pending = list(_late)
+        _late.clear()
+    if not pending:
+        return 0, 0
+    done, not_done = wait(pending, timeout=timeout)
+    return len(done), len(not_done)
+
+class LateSummary:
+    """
+    A model summary that may land after its update was saved with the local
+    summary. Rows attached before it lands are backfilled when it does; rows
+    attached afterwards are backfilled right away.
+    """
+
+    def __init__(self):
+        self.summary = None
+        self.row_ids = []
+        self._lock = threading.Lock()
+
+    def resolve(self, summary):
+        with self._lock:
+            self.summary = summary
+            row_ids = list(self.row_ids)
+        for row_id in row_ids:
+            self.backfill(row_id, summary)
+
+    def attach(self, row_id):
+        with self._lock:
+            self.row_ids.append(row_id)
+            summary = self.summary
+        if summary is not None:
+            self.backfill(row_id, summary)
+
+    def backfill(self, row_id, summary):
+        update_summary(row_id, summary)
+        print(f"Backfilled late model summary into update {row_id}")
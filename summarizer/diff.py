@@ -0,0 +1,69 @@
+# summarizer/diff.py
+
+import difflib
+import os
+import re
+
+DEFAULT_CONTEXT_LINES = 2
+# Diffs bigger than this share of the new content aren't worth it: send the full content
+DEFAULT_MAX_DIFF_RATIO = 0.6
+
+# Content with fewer lines than this is diffed sentence by sentence instead
+MIN_DIFF_LINES = 4
+
+def is_diff_mode_enabled():
+    """Check whether changes are summarized from a diff against the previous version (SUMMARY_DIFF_MODE)."""
+    return os.getenv("SUMMARY_DIFF_MODE", "true").lower() == "true"
+
+def get_context_lines():
+    """Unchanged lines kept around each change (SUMMARY_DIFF_CONTEXT)."""
+    return max(0, int(os.getenv("SUMMARY_DIFF_CONTEXT", DEFAULT_CONTEXT_LINES)))
+
+def get_max_diff_ratio():
+    """Largest diff, relative to the new content, still sent instead of the content (SUMMARY_DIFF_MAX_RATIO)."""
+    return float(os.getenv("SUMMARY_DIFF_MAX_RATIO", DEFAULT_MAX_DIFF_RATIO))
+
+def split_units(text):
+    """
+    Split content into diffable units: lines, or sentences when the scrapers
+    flattened the content onto a few long lines.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) >= MIN_DIFF_LINES:
+        return lines
+    return [part.strip() for part in re.split(r'(?<=[.!?:])\s+', text) if part.strip()]
+
+def build_diff(previous, current, context=None):
+    """
+    Build a compact unified diff between two versions: changed units prefixed
+    with '+'/'-', a little unchanged context prefixed with ' ', and '...' between hunks.
+    """
+    context = get_context_lines() if context is None else context
+    lines = []
+    diff = difflib.unified_diff(split_units(previous), split_units(current), n=context, lineterm="")
+    for line in diff:
+        if line.startswith(("---", "+++")):
+            continue
+        if line.startswith("@@"):
+            if lines:
+                lines.append("...")
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+def prepare_summary_input(content, previous_content=None):
+    """
+    Pick what to send to the model for a change.
+
+    Returns (text, is_diff): the diff against previous_content when it is
+    meaningfully smaller than the new content, otherwise the full content.
+    """
+    if not is_diff_mode_enabled() or not previous_content or previous_content == content:
+        return content, False
+    diff = build_diff(previous_content, content)
+    if not diff.strip():
+        # Only whitespace moved between units
+        return content, False
+    if len(diff) > len(content) * get_max_diff_ratio():
+        return content, False
+    return diff, True
@@ -0,0 +1,208 @@
+# summarizer/extractive.py
+
+import re
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; summaries fall back to lead sentences
+    np = None
+
+DEFAULT_MAX_SENTENCES = 3
+# MMR trade-off between sentence importance (1.0) and novelty against already picked sentences (0.0)
+MMR_LAMBDA = 0.6
+# Sentences at least this similar to an already picked one are never picked
+DUPLICATE_SIMILARITY = 0.6
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+# Upper bound on sentences scored in one similarity matrix; larger batches are split by document
+MAX_SENTENCES_PER_PASS = 2000
+
+MIN_SENTENCE_WORDS = 4
+MAX_SENTENCE_CHARS = 300
+
+STOPWORDS = set("""
+a an and are as at be been but by can for from has have if in into is it its of on or our
+so that the their them then there these they this to was we were will with you your
+""".split())
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(])|\n+')
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'+.-]*[a-z0-9]|[a-z0-9]")
+
+def split_sentences(text):
+    """Split text into candidate sentences, dropping bullets and fragments too short to stand alone."""
+    sentences = []
+    for part in SENTENCE_SPLIT.split(text or ""):
+        sentence = part.strip().lstrip('•-*· ').strip()
+        if len(sentence.split()) >= MIN_SENTENCE_WORDS:
+            sentences.append(sentence[:MAX_SENTENCE_CHARS])
+    return sentences
+
+def tokenize(sentence):
+    return [word for word in WORD_PATTERN.findall(sentence.lower()) if word not in STOPWORDS]
+
+def tfidf_matrix(tokenized):
+    """Build an L2-normalized TF-IDF matrix (sentences x vocabulary) for tokenized sentences."""
+    vocabulary = {}
+    rows = []
+    cols = []
+    for row, tokens in enumerate(tokenized):
+        for token in tokens:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    matrix = np.zeros((len(tokenized), max(1, len(vocabulary))))
+    if rows:
+        np.add.at(matrix, (np.array(rows), np.array(cols)), 1.0)
+    # Sublinear term frequency, smoothed inverse sentence frequency
+    matrix = np.log1p(matrix)
+    document_frequency = (matrix > 0).sum(axis=0)
+    idf = np.log((1 + len(tokenized)) / (1 + document_frequency)) + 1
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+def textrank_scores(similarity, doc_ids):
+    """
+    Score every sentence of every document in one power iteration.
+    Cross-document similarities are masked out, so the matrix is block diagonal
+    and each document's scores are independent of the others.
+    """
+    same_doc = doc_ids[:, None] == doc_ids[None, :]
+    weights = np.where(same_doc, similarity, 0.0)
+    np.fill_diagonal(weights, 0.0)
+    out_degree = weights.sum(axis=1, keepdims=True)
+    # Sentences without similar neighbours keep only the teleport share
+    transition = np.divide(weights, out_degree, out=np.zeros_like(weights), where=out_degree > 0)
+
+    doc_sizes = np.bincount(doc_ids)[doc_ids].astype(float)
+    teleport = (1 - TEXTRANK_DAMPING) / doc_sizes
+    scores = 1.0 / doc_sizes
+    for _ in range(TEXTRANK_ITERATIONS):
+        scores = teleport + TEXTRANK_DAMPING * (transition.T @ scores)
+    return scores
+
+def select_mmr(scores, similarity, count):
+    """Pick `count` sentence indices by maximal marginal relevance (importance minus redundancy)."""
+    selected = []
+    candidates = list(range(len(scores)))
+    relevance = scores / (scores.max() or 1)
+    while candidates and len(selected) < count:
+        if selected:
+            redundancy = similarity[np.ix_(candidates, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(candidates))
+        mmr = MMR_LAMBDA * relevance[candidates] - (1 - MMR_LAMBDA) * redundancy
+        mmr[redundancy >= DUPLICATE_SIMILARITY] = -np.inf
+        if np.isneginf(mmr).all():
+            break
+        best = candidates[int(np.argmax(mmr))]
+        selected.append(best)
+        candidates.remove(best)
+    return sorted(selected)
+
+def _summarize_pass(documents, max_sentences):
+    """Score a group of already split documents in one vectorized pass."""
+    sentences = [sentence for document in documents for sentence in document]
+    doc_ids = np.repeat(np.arange(len(documents)), [len(document) for document in documents])
+    matrix = tfidf_matrix([tokenize(sentence) for sentence in sentences])
+    similarity = matrix @ matrix.T
+    scores = textrank_scores(similarity, doc_ids)
+
+    # Earlier sentences (titles, lead paragraphs) get a small boost
+    positions = np.concatenate([np.arange(len(document)) for document in documents])
+    scores = scores * (1 + 0.2 / (1 + positions))
+
+    results = []
+    start = 0
+    for document in documents:
+        end = start + len(document)
+        picked = select_mmr(scores[start:end], similarity[start:end, start:end], max_sentences)
+        results.append([document[index] for index in picked])
+        start = end
+    return results
+
+def extract_key_sentences_batch(texts, max_sentences=DEFAULT_MAX_SENTENCES):
+    """
+    Pick the most central, non-redundant sentences of each text (TextRank over
+    TF-IDF cosine similarity, then MMR), scoring a whole batch of texts together.
+
+    Returns a list with the selected sentences of each text, in original order.
+    Without numpy, the first sentences of each text are returned.
+    """
+    split = [split_sentences(text) for text in texts]
+    if np is None:
+        return [sentences[:max_sentences] for sentences in split]
+
+    results = [None] * len(texts)
+    group = []
+    group_size = 0
+    for index, sentences in enumerate(split):
+        if len(sentences) <= max_sentences:
+            results[index] = sentences
+            continue
+        if group and group_size + len(sentences) > MAX_SENTENCES_PER_PASS:
+            for (group_index, _), picked in zip(group, _summarize_pass([s for _, s in group], max_sentences)):
+                results[group_index] = picked
+            group = []
+            group_size = 0
+        group.append((index, sentences))
+        group_size += len(sentences)
+    if group:
+        for (group_index, _), picked in zip(group, _summarize_pass([s for _, s in group], max_sentences)):
+            results[group_index] = picked
+    return results
+
+def extract_key_sentences(text, max_sentences=DEFAULT_MAX_SENTENCES):
+    """Pick the key sentences of a single text (see extract_key_sentences_batch)."""
+    return extract_key_sentences_batch([text], max_sentences)[0]
+
+def keyword_key_points(lines):
+    """Pick key points by keyword and bullet matching (used when numpy isn't installed)."""
+    key_points = []
+    for line in lines[:10]:  # Look at first 10 lines
+        line = line.strip()
+        if len(line) > 20 and len(line) < 200:  # Reasonable length
+            # Look for lines that might be key points
+            if any(keyword in line.lower() for keyword in ['new', 'feature', 'update', 'improved', 'added', 'enhanced', 'launched', 'released']):
+                key_points.append(line)
+            elif line.startswith(('•', '-', '*', '1.', '2.', '3.')):
+                key_points.append(line.lstrip('•-*1234567890. '))
+    return key_points[:5]  # Limit to 5 points
+
+def simple_summarize_batch(items):
+    """
+    Summarize several updates without a model (the extractive fallback).
+    Key points are picked by the extractive summarizer in one vectorized pass
+    over all items.
+
+    Args:
+        items: List of (content, source_type) pairs
+
+    Returns:
+        List of summaries, in the same order
+    """
+    # The first line is shown as the title, so key points come from the rest
+    contents = [(content or "").strip().partition('\n')[2] or (content or "") for content, _ in items]
+    if np is not None:
+        key_points_list = extract_key_sentences_batch(contents)
+    else:
+        key_points_list = [keyword_key_points([l.strip() for l in c.split('\n') if l.strip()]) for c in contents]
+    
+    summaries = []
+    for (content, source_type), key_points in zip(items, key_points_list):
+        content = content or ""
+        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        title = lines[0][:100] if lines else "Update"
+        
+        summary = f"**{(source_type or 'update').title()} Update**\n\n"
+        summary += f"**Title:** {title}\n\n"
+        
+        if key_points:
+            summary += "**Key Points:**\n"
+            summary += "\n".join(f"• {point}" for point in key_points) + "\n\n"
+        else:
+            # Nothing stood out: show the start of the content instead
+            content_preview = content[:300] + "..." if len(content) > 300 else content
+            summary += f"**Content Preview:**\n{content_preview}\n\n"
+        summaries.append(summary)
+    return summaries
@@ -0,0 +1,130 @@
+# summarizer/prompts.py
+
+import json
+import os
+import re
+
+# Batched summarization: estimated input tokens and updates per request
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
+DEFAULT_BATCH_MAX_ITEMS = 10
+BATCH_PROMPT_TOKENS = 120  # instructions around the updates
+BATCH_ITEM_TOKENS = 20     # id/type/JSON framing per update
+
+DIFF_INSTRUCTIONS = (
+    "Lines starting with + were added, lines starting with - were removed, "
+    "other lines are unchanged context and ... separates changed sections."
+)
+
+def build_prompt(content, source_type="update", is_diff=False):
+    """Build the prompt for summarizing one update (or the diff of one update)."""
+    if is_diff:
+        return f"""
+        Summarize what changed in this {source_type} update from a competitor in a clear, concise way.
+        {DIFF_INSTRUCTIONS}
+        Focus on:
+        - What new feature or change was announced
+        - Key benefits or improvements
+        - Impact on users or market
+        Keep it under 50 words. Do not break sentences in the middle. End with a complete sentence.
+        Diff:
+        {content}
+        """
+    return f"""
+        Summarize this {source_type} update from a competitor in a clear, concise way.
+        Focus on:
+        - What new feature or change was announced
+        - Key benefits or improvements
+        - Impact on users or market
+        Keep it under 50 words. Do not break sentences in the middle. End with a complete sentence.
+        Content:
+        {content}
+        """
+
+def trim_summary(text):
+    """Truncate a model summary to 50 words, ending at a sentence if possible."""
+    words = text.split()
+    if len(words) > 50:
+        # Find the last period before 50th word
+        joined = ' '.join(words[:60])  # allow a little extra
+        last_period = joined.rfind('.')
+        if last_period != -1 and last_period < len(joined):
+            return joined[:last_period+1].strip()
+        return ' '.join(words[:50]).strip()
+    return text.strip()
+
+def get_batch_token_budget():
+    """Estimated input tokens allowed in one batched request (SUMMARY_BATCH_TOKEN_BUDGET)."""
+    return int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", DEFAULT_BATCH_TOKEN_BUDGET))
+
+def get_batch_max_items():
+    """Maximum number of updates in one batched request (SUMMARY_BATCH_MAX_ITEMS)."""
+    return max(1, int(os.getenv("SUMMARY_BATCH_MAX_ITEMS", DEFAULT_BATCH_MAX_ITEMS)))
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+def pack_batches(updates, token_budget=None, max_items=None):
+    """
+    Group updates into batches whose estimated prompt size fits the token budget.
+    An update larger than the budget on its own gets a batch to itself.
+    """
+    token_budget = token_budget or get_batch_token_budget()
+    max_items = max_items or get_batch_max_items()
+    batches = []
+    current = []
+    used = BATCH_PROMPT_TOKENS
+    for update in updates:
+        cost = estimate_tokens(update['content']) + BATCH_ITEM_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            used = BATCH_PROMPT_TOKENS
+        current.append(update)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def build_batch_prompt(batch):
+    """Build one prompt asking for a JSON object of summaries keyed by update id."""
+    items = []
+    for update in batch:
+        item = {'id': update['id'], 'type': update.get('source_type', 'update')}
+        item['diff' if update.get('is_diff') else 'content'] = update['content']
+        items.append(item)
+    return f"""
+        Summarize each of these competitor updates in a clear, concise way.
+        Updates with a "diff" instead of "content" show only what changed. {DIFF_INSTRUCTIONS}
+        For each update focus on:
+        - What new feature or change was announced
+        - Key benefits or improvements
+        - Impact on users or market
+        Keep each summary under 50 words. Do not break sentences in the middle. End with a complete sentence.
+        Respond with only a JSON object mapping each update "id" to its summary string.
+        Updates:
+        {json.dumps(items, ensure_ascii=False)}
+        """
+
+def parse_batch_response(text, ids):
+    """
+    Parse a batched JSON response into {id: summary}.
+    Ids that are missing or not plain strings are left out, so callers can fall back per update.
+    """
+    if not text:
+        return {}
+    # Models sometimes wrap JSON in a ```json fence or add a sentence around it
+    match = re.search(r'\{.*\}', text, re.S)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        update_id: data[update_id].strip()
+        for update_id in ids
+        if isinstance(data.get(update_id), str) and data[update_id].strip()
+    }
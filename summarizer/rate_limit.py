@@ -0,0 +1,133 @@
+# summarizer/rate_limit.py
+
+import asyncio
+import re
+import threading
+import time
+
+# Rate multiplier bounds for adaptive backoff: halve on a rate-limit error, recover gradually
+MIN_RATE_SCALE = 0.125
+RATE_RECOVERY_STEP = 0.125
+DEFAULT_BACKOFF_SECONDS = 30
+
+class RateLimiter:
+    """
+    Token bucket limiting requests per minute (rpm) and, optionally, model tokens
+    per minute (tpm).
+
+    Callers reserve capacity under a lock and then sleep outside it, so the limiter
+    can be shared by threads (acquire) and asyncio tasks (acquire_async). Buckets may
+    go negative: each caller's reservation pushes the next caller's wait further out,
+    which keeps concurrent callers in order without busy-waiting.
+    """
+
+    def __init__(self, rpm, tpm=None):
+        self.rpm = float(rpm)
+        self.tpm = float(tpm) if tpm else None
+        self.rate_scale = 1.0
+        self._requests = self.rpm
+        self._tokens = self.tpm
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0, 'max_wait': 0.0, 'backoffs': 0}
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm * self.rate_scale / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm * self.rate_scale / 60)
+
+    def reserve(self, tokens=1):
+        """Reserve one request and `tokens` model tokens. Returns the seconds to wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._requests -= 1
+            delay = max(0.0, -self._requests * 60 / (self.rpm * self.rate_scale))
+            if self.tpm:
+                self._tokens -= min(tokens, self.tpm)
+                delay = max(delay, -self._tokens * 60 / (self.tpm * self.rate_scale))
+            delay = max(delay, self._blocked_until - now)
+
+            self._stats['acquired'] += 1
+            if delay > 0:
+                self._stats['waited'] += 1
+                self._stats['wait_seconds'] += delay
+                self._stats['max_wait'] = max(self._stats['max_wait'], delay)
+            return delay
+
+    def acquire(self, tokens=1):
+        """Block the calling thread until a request may be sent. Returns the seconds waited."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens=1):
+        """Asyncio version of acquire; waits without blocking the event loop."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def backoff(self, retry_after=None):
+        """
+        React to a rate-limit response: pause everyone for retry_after seconds
+        (if the server gave a hint) and halve the sending rate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            self.rate_scale = max(MIN_RATE_SCALE, self.rate_scale / 2)
+            self._stats['backoffs'] += 1
+
+    def record_success(self):
+        """Let the sending rate recover towards the configured limits after a successful request."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate_scale = min(1.0, self.rate_scale + RATE_RECOVERY_STEP)
+
+    def get_stats(self):
+        """Return request, wait and backoff counters, plus the current rate multiplier."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['rate_scale'] = self.rate_scale
+        return stats
+
+def parse_retry_delay(error):
+    """
+    Read the server's backoff hint from a rate-limit error, in seconds.
+
+    Looks at structured RetryInfo details (google.api_core errors), then a
+    Retry-After header on an attached HTTP response, then the error text.
+    Returns None when there is no hint.
+    """
+    for detail in getattr(error, 'details', None) or []:
+        retry_delay = getattr(detail, 'retry_delay', None)
+        if retry_delay is not None and getattr(retry_delay, 'seconds', None) is not None:
+            return retry_delay.seconds + getattr(retry_delay, 'nanos', 0) / 1e9
+
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    retry_after = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    match = re.search(r'retry_delay\s*{\s*seconds:\s*(\d+)', str(error))
+    if match:
+        return float(match.group(1))
+    return None
+
+def is_rate_limit_error(error):
+    """Check whether an exception is a quota / rate-limit error (HTTP 429, RESOURCE_EXHAUSTED)."""
+    if getattr(error, 'code', None) == 429 or getattr(getattr(error, 'response', None), 'status_code', None) == 429:
+        return True
+    message = str(error)
+    return "429" in message or "quota" in message.lower() or "resource_exhausted" in message.lower()
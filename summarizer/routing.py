@@ -0,0 +1,126 @@
+# summarizer/routing.py
+
+import os
+import threading
+from summarizer.backends import get_backend, get_backend_name, OUTPUT_TOKEN_ESTIMATE
+from summarizer.prompts import estimate_tokens
+
+# local: extractive summarizer, fast: small model, heavy: the configured (large) model
+ROUTES = ('local', 'fast', 'heavy')
+
+DEFAULT_LOCAL_MAX_CHARS = 200
+DEFAULT_HEAVY_MIN_CHARS = 1500
+DEFAULT_HEAVY_MIN_DIFF_LINES = 15
+# Pricing changes are worth the heavy model whatever their size
+DEFAULT_ROUTE_OVERRIDES = {'pricing': 'heavy'}
+
+# Fast model per backend when SUMMARY_FAST_MODEL isn't set (None: the backend's default model)
+DEFAULT_FAST_MODELS = {'gemini': 'gemini-1.5-flash'}
+
+# Estimated USD per 1000 tokens, for the cost counters (SUMMARY_<ROUTE>_COST_PER_1K_TOKENS)
+DEFAULT_COST_PER_1K_TOKENS = {
+    'local': 0.0,
+    'fast': 0.000075,
+    'heavy': 0.00125,
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+def is_routing_enabled():
+    """Check whether updates are routed by size and type (SUMMARY_ROUTING, on by default)."""
+    return os.getenv("SUMMARY_ROUTING", "true").lower() == "true"
+
+def get_local_max_chars():
+    """Text up to this length is summarized locally (SUMMARY_LOCAL_MAX_CHARS)."""
+    return int(os.getenv("SUMMARY_LOCAL_MAX_CHARS", DEFAULT_LOCAL_MAX_CHARS))
+
+def get_heavy_min_chars():
+    """Text from this length on goes to the heavy model (SUMMARY_HEAVY_MIN_CHARS)."""
+    return int(os.getenv("SUMMARY_HEAVY_MIN_CHARS", DEFAULT_HEAVY_MIN_CHARS))
+
+def get_heavy_min_diff_lines():
+    """Diffs with this many changed lines go to the heavy model (SUMMARY_HEAVY_MIN_DIFF_LINES)."""
+    return int(os.getenv("SUMMARY_HEAVY_MIN_DIFF_LINES", DEFAULT_HEAVY_MIN_DIFF_LINES))
+
+def get_route_overrides():
+    """
+    Fixed routes per source type, overridable with
+    SUMMARY_ROUTE_OVERRIDES="pricing=heavy,github=fast".
+    """
+    overrides = dict(DEFAULT_ROUTE_OVERRIDES)
+    for item in os.getenv("SUMMARY_ROUTE_OVERRIDES", "").split(","):
+        if "=" in item:
+            source_type, route = item.split("=", 1)
+            route = route.strip().lower()
+            if route in ROUTES:
+                overrides[source_type.strip().lower()] = route
+            elif route == "none":
+                overrides.pop(source_type.strip().lower(), None)
+    return overrides
+
+def get_cost_per_1k_tokens(route):
+    return float(os.getenv(f"SUMMARY_{route.upper()}_COST_PER_1K_TOKENS", DEFAULT_COST_PER_1K_TOKENS.get(route, 0.0)))
+
+def count_changed_lines(diff):
+    """Added and removed lines in a diff built by summarizer/diff.py."""
+    return sum(1 for line in diff.splitlines() if line.startswith(("+", "-")))
+
+def choose_route(source_type, text, is_diff=False):
+    """
+    Pick the route for one update from its source type, the length of the text
+    sent to the model and, for diffs, the number of changed lines.
+    """
+    if not is_routing_enabled():
+        return 'heavy'
+    override = get_route_overrides().get((source_type or "").lower())
+    if override:
+        return override
+    if len(text) <= get_local_max_chars():
+        return 'local'
+    if len(text) >= get_heavy_min_chars():
+        return 'heavy'
+    if is_diff and count_changed_lines(text) >= get_heavy_min_diff_lines():
+        return 'heavy'
+    return 'fast'
+
+def get_route_backend(route):
+    """
+    Backend serving a route. local is the extractive summarizer; fast and heavy use
+    SUMMARY_<ROUTE>_BACKEND / SUMMARY_<ROUTE>_MODEL, defaulting to the configured backend.
+    Without a model backend (e.g. DISABLE_GEMINI_API=true) every route is local.
+    """
+    default_name = get_backend_name()
+    if route == 'local' or default_name == 'extractive':
+        return get_backend('extractive')
+    name = os.getenv(f"SUMMARY_{route.upper()}_BACKEND", default_name).lower()
+    model = os.getenv(f"SUMMARY_{route.upper()}_MODEL")
+    if not model and route == 'fast':
+        model = DEFAULT_FAST_MODELS.get(name)
+    return get_backend(name, model or None)
+
+def record_route(route, backend, texts, seconds, hedged=False):
+    """
+    Count one backend call on a route: updates, latency, estimated tokens and cost,
+    and whether the local summary was used because the model missed its deadline.
+    Tokens and cost are only charged when a model backend served the call.
+    """
+    tokens = 0 if backend.local else sum(estimate_tokens(text) + OUTPUT_TOKEN_ESTIMATE for text in texts)
+    with _stats_lock:
+        stats = _stats.setdefault(route, {
+            'model': backend.model, 'calls': 0, 'updates': 0, 'seconds': 0.0, 'tokens': 0, 'cost': 0.0, 'hedged': 0
+        })
+        stats['calls'] += 1
+        stats['hedged'] += int(hedged)
+        stats['updates'] += len(texts)
+        stats['seconds'] += seconds
+        stats['tokens'] += tokens
+        stats['cost'] += tokens / 1000 * get_cost_per_1k_tokens(route)
+
+def get_route_stats():
+    """Per-route counters for this process, with mean latency per update."""
+    with _stats_lock:
+        stats = {route: dict(values) for route, values in _stats.items()}
+    for values in stats.values():
+        values['mean_latency'] = values['seconds'] / values['updates'] if values['updates'] else 0.0
+    return stats
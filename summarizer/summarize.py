@@ -1,136 +1,241 @@
 # summarizer/summarize.py
 
-import os
+import re
 import time
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import re
-from datetime import datetime, timedelta
+from summarizer import cache as summary_cache
+from summarizer import extractive
+from summarizer.deadline import run_hedged, LateSummary
+from summarizer.diff import prepare_summary_input
+from summarizer.routing import choose_route, get_route_backend, record_route
 
-# Global rate limiting
-last_request_time = None
-MIN_REQUEST_INTERVAL = 10  # Minimum 10 seconds between requests for free tier (reduced from 30)
+# Bump when the prompt changes so cached summaries from the old prompt aren't reused
+PROMPT_VERSION = 1
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
 def simple_summarize(content, source_type="update"):
     """
     Simple fallback summarization when Gemini API is unavailable.
     """
-    # Extract key information without AI
-    lines = [line.strip() for line in content.split('\n') if line.strip()]
-    title = lines[0][:100] if lines else "Update"
-    
-    # Create a basic summary
-    summary = f"**{source_type.title()} Update**\n\n"
-    summary += f"**Title:** {title}\n\n"
-    
-    # Try to extract key points from the content
-    key_points = []
-    for line in lines[:10]:  # Look at first 10 lines
-        line = line.strip()
-        if len(line) > 20 and len(line) < 200:  # Reasonable length
-            # Look for lines that might be key points
-            if any(keyword in line.lower() for keyword in ['new', 'feature', 'update', 'improved', 'added', 'enhanced', 'launched', 'released']):
-                key_points.append(f"• {line}")
-            elif line.startswith(('•', '-', '*', '1.', '2.', '3.')):
-                key_points.append(f"• {line.lstrip('•-*1234567890. ')}")
-    
-    if key_points:
-        summary += "**Key Points:**\n"
-        summary += "\n".join(key_points[:5]) + "\n\n"  # Limit to 5 points
-    
-    # Add content preview
-    content_preview = content[:300] + "..." if len(content) > 300 else content
-    summary += f"**Content Preview:**\n{content_preview}\n\n"
+    return extractive.simple_summarize_batch([(content, source_type)])[0]
+
+def get_prompt_version(is_diff):
+    """Prompt version used in cache keys; diff prompts are cached separately from full-content ones."""
+    return f"{PROMPT_VERSION}-diff" if is_diff else PROMPT_VERSION
+
+def route_update(source_type, text, is_diff, backend=None):
+    """
+    Pick the route and backend for one update (see summarizer/routing.py).
+    An explicitly passed backend bypasses routing.
+    """
+    if backend is not None:
+        return 'default', backend
+    route = choose_route(source_type, text, is_diff)
+    return route, get_route_backend(route)
+
+def local_input(content, text, is_diff):
+    """Text for the extractive summarizer: the added lines of a diff, or the full content."""
+    if is_diff:
+        added = [line[1:].strip() for line in text.splitlines() if line.startswith("+") and line[1:].strip()]
+        if added:
+            return "\n".join(added)
+    return content
+
+def summarize_with_backend(content, source_type="update", previous_content=None, backend=None):
+    """
+    Summarize competitor update content, routed by size and type to the local
+    summarizer, the fast model or the heavy model (see summarizer/routing.py).
+    With previous_content, only a diff of what changed is sent when it is much smaller.
+    """
+    text, is_diff = prepare_summary_input(content, previous_content)
+    route, backend = route_update(source_type, text, is_diff, backend)
+    if backend.local:
+        started = time.monotonic()
+        summary = backend.summarize({'id': '0', 'content': local_input(content, text, is_diff), 'source_type': source_type})
+        record_route(route, backend, [text], time.monotonic() - started)
+        return summary
+    if not backend.is_available():
+        print(f"{backend.label} is not configured. Using fallback summarization.")
+        return simple_summarize(content, source_type)
     
-    return summary
+    if is_diff:
+        print(f"Summarizing diff ({len(text)} chars instead of {len(content)})")
+    
+    # Summaries of previously seen content skip both the request and the rate-limit wait
+    cached = summary_cache.get_summary(text, source_type, get_prompt_version(is_diff), backend.model)
+    if cached is not None:
+        print("Summary cache hit. Skipping model request.")
+        return cached
+    
+    def call_model():
+        try:
+            return backend.summarize({'id': '0', 'content': text, 'source_type': source_type, 'is_diff': is_diff})
+        except Exception:
+            # Already reported by the backend
+            return None
+    
+    def on_late(summary):
+        # Too late for this update, but the next run with the same content reuses it
+        if summary:
+            summary_cache.save_summary(text, source_type, get_prompt_version(is_diff), backend.model, summary)
+    
+    started = time.monotonic()
+    summary, from_model = run_hedged(call_model, lambda: simple_summarize(content, source_type), on_late)
+    record_route(route, backend, [text], time.monotonic() - started, hedged=not from_model)
+    if not from_model:
+        return summary
+    
+    if summary:
+        summary_cache.save_summary(text, source_type, get_prompt_version(is_diff), backend.model, summary)
+        return summary
+    print(f"No summary from {backend.label}. Using fallback.")
+    return simple_summarize(content, source_type)
+
+def format_summary(summary, update):
+    """Format a raw summary for Slack/Notion as summarize_update does."""
+    return truncate_summary(format_for_slack_and_notion(
+        summary,
+        competitor=update.get('competitor'),
+        update_type=update.get('source_type', 'update')
+    ))
 
-def summarize_with_gemini(content, source_type="update"):
+def run_route(route, backend, updates):
     """
-    Summarize competitor update content using Google Gemini API.
+    Summarize one route's updates in a batched backend call, recording latency and cost.
+    Model calls get a deadline and are hedged with the local summarizer (see summarizer/deadline.py).
+
+    Returns (summaries, from_model, late): late maps update ids to a LateSummary
+    that receives the model summary if it lands after the local one was used.
     """
-    global last_request_time
+    started = time.monotonic()
+    texts = [update['content'] for update in updates]
+    if backend.local:
+        summaries = backend.summarize_batch(updates)
+        record_route(route, backend, texts, time.monotonic() - started)
+        return summaries, False, {}
     
-    if not os.getenv("GEMINI_API_KEY"):
-        print("No GEMINI_API_KEY set. Using fallback summarization.")
-        return simple_summarize(content, source_type)
+    late = {update['id']: LateSummary() for update in updates}
     
-    # Global rate limiting
-    if last_request_time:
-        time_since_last = datetime.now() - last_request_time
-        if time_since_last.total_seconds() < MIN_REQUEST_INTERVAL:
-            wait_time = MIN_REQUEST_INTERVAL - time_since_last.total_seconds()
-            print(f"Rate limiting: Waiting {wait_time:.1f} seconds before next Gemini request...")
-            time.sleep(wait_time)
-    
-    try:
-        # Update last request time
-        last_request_time = datetime.now()
-        
-        model = genai.GenerativeModel('gemini-1.5-pro')
-        
-        prompt = f"""
-        Summarize this {source_type} update from a competitor in a clear, concise way.
-        Focus on:
-        - What new feature or change was announced
-        - Key benefits or improvements
-        - Impact on users or market
-        Keep it under 50 words. Do not break sentences in the middle. End with a complete sentence.
-        Content:
-        {content}
-        """
-        
-        response = model.generate_content(prompt)
-        
-        if response.text:
-            # Truncate to 50 words, ending at a sentence if possible
-            words = response.text.split()
-            if len(words) > 50:
-                # Find the last period before 50th word
-                joined = ' '.join(words[:60])  # allow a little extra
-                last_period = joined.rfind('.')
-                if last_period != -1 and last_period < len(joined):
-                    summary = joined[:last_period+1]
-                else:
-                    summary = ' '.join(words[:50])
-                return summary.strip()
-            return response.text.strip()
-        else:
-            print("Empty response from Gemini. Using fallback.")
-            return simple_summarize(content, source_type)
-            
-    except Exception as e:
-        error_msg = str(e)
-        if "429" in error_msg or "quota" in error_msg.lower():
-            print(f"Gemini API rate limit exceeded. Using fallback summarization.")
-            print(f"Error: {error_msg}")
-            # Extract retry delay from error message if available
-            if "retry_delay" in error_msg and not should_skip_rate_limit_wait():
-                try:
-                    import re
-                    retry_match = re.search(r'retry_delay\s*{\s*seconds:\s*(\d+)', error_msg)
-                    if retry_match:
-                        retry_seconds = int(retry_match.group(1))
-                        print(f"Rate limit detected. Waiting {retry_seconds} seconds... (Press Ctrl+C to skip)")
-                        try:
-                            time.sleep(retry_seconds)
-                            print("Resume after rate limit wait.")
-                        except KeyboardInterrupt:
-                            print("Rate limit wait skipped by user.")
-                except:
-                    pass
-            elif should_skip_rate_limit_wait():
-                print("Rate limit wait skipped via SKIP_RATE_LIMIT_WAIT environment variable.")
-            return simple_summarize(content, source_type)
+    def call_model():
+        try:
+            return backend.summarize_batch(updates)
+        except Exception as e:
+            print(f"Error summarizing with {backend.label}: {e}")
+            return {}
+    
+    def local_summaries():
+        summaries = extractive.simple_summarize_batch(
+            [(update['full_content'], update.get('source_type', 'update')) for update in updates]
+        )
+        return {update['id']: summary for update, summary in zip(updates, summaries)}
+    
+    def on_late(summaries):
+        for update in updates:
+            summary = summaries.get(update['id'])
+            if summary:
+                summary_cache.save_summary(
+                    update['content'], update.get('source_type', 'update'),
+                    get_prompt_version(update['is_diff']), backend.model, summary
+                )
+                late[update['id']].resolve(format_summary(summary, update))
+    
+    summaries, from_model = run_hedged(call_model, local_summaries, on_late)
+    record_route(route, backend, texts, time.monotonic() - started, hedged=not from_model)
+    return summaries, from_model, ({} if from_model else late)
+
+def summarize_batch(updates, backend=None, late_summaries=None):
+    """
+    Summarize several updates with as few model requests as possible.
+    Updates are routed by size and type; each route is summarized in batched
+    requests, and the routes run concurrently.
+
+    Args:
+        updates: List of dicts with 'id', 'content', 'source_type' and optional
+            'competitor' and 'previous_content' (enables diff-only prompts)
+        backend: Backend to use for every update instead of routing
+        late_summaries: Optional dict filled with {id: LateSummary} for updates
+            that got the local summary because the model missed its deadline;
+            attach the saved row id to backfill the model summary when it lands
+
+    Returns:
+        Dictionary mapping each update id to its formatted summary (as summarize_update returns)
+    """
+    raw_summaries = {}
+    routes = {}
+    fallbacks = []
+    unavailable = set()
+    cached_count = 0
+    
+    for update in updates:
+        source_type = update.get('source_type', 'update')
+        text, is_diff = prepare_summary_input(update['content'], update.get('previous_content'))
+        route, route_backend = route_update(source_type, text, is_diff, backend)
+        if route_backend.local:
+            routes.setdefault(route, (route_backend, []))[1].append(
+                dict(update, content=local_input(update['content'], text, is_diff), is_diff=False)
+            )
+            continue
+        if not route_backend.is_available():
+            unavailable.add(route_backend.label)
+            fallbacks.append(update)
+            continue
+        cached = summary_cache.get_summary(text, source_type, get_prompt_version(is_diff), route_backend.model)
+        if cached is not None:
+            raw_summaries[update['id']] = cached
+            cached_count += 1
         else:
-            print(f"Error summarizing with Gemini: {e}")
-            print("Using fallback summarization.")
-            return simple_summarize(content, source_type)
+            # The model sees the diff (if any); fallbacks still use the full content
+            routes.setdefault(route, (route_backend, []))[1].append(
+                dict(update, content=text, is_diff=is_diff, full_content=update['content'])
+            )
+    
+    for label in sorted(unavailable):
+        print(f"{label} is not configured. Using fallback summarization.")
+    if routes:
+        print(f"Routing {len(updates)} updates: " + ", ".join(
+            f"{route} {len(items)} ({route_backend.model})" for route, (route_backend, items) in routes.items()
+        ) + f", {cached_count} cached")
+        diffs = [u for _, items in routes.values() for u in items if u['is_diff']]
+        if diffs:
+            print(f"Diff mode: {len(diffs)} updates sent as diffs "
+                  f"({sum(len(u['content']) for u in diffs)} chars instead of {sum(len(u['full_content']) for u in diffs)})")
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(routes))) as executor:
+        futures = {
+            route: executor.submit(run_route, route, route_backend, items)
+            for route, (route_backend, items) in routes.items()
+        }
+    
+    for route, (route_backend, items) in routes.items():
+        summaries, from_model, late = futures[route].result()
+        if late_summaries is not None:
+            late_summaries.update(late)
+        for update in items:
+            source_type = update.get('source_type', 'update')
+            summary = summaries.get(update['id'])
+            if not from_model:
+                raw_summaries[update['id']] = summary
+            elif summary:
+                summary_cache.save_summary(
+                    update['content'], source_type, get_prompt_version(update['is_diff']), route_backend.model, summary
+                )
+                raw_summaries[update['id']] = summary
+            else:
+                print(f"No summary for update {update['id']} in {route_backend.label} response. Using fallback.")
+                fallbacks.append(dict(update, content=update['full_content']))
+    
+    # Updates without a model summary are scored together in one extractive pass
+    if fallbacks:
+        fallback_summaries = extractive.simple_summarize_batch(
+            [(update['content'], update.get('source_type', 'update')) for update in fallbacks]
+        )
+        for update, summary in zip(fallbacks, fallback_summaries):
+            raw_summaries[update['id']] = summary
+    
+    return {update['id']: format_summary(raw_summaries[update['id']], update) for update in updates}
 
 def format_for_slack_and_notion(summary, competitor=None, update_type=None):
     """
@@ -178,19 +283,11 @@ def truncate_summary(summary, max_chars=900, max_words=180):
         summary = summary.rstrip() + '\n[Summary truncated due to length limit.]'
     return summary
 
-def summarize_update(content, source_type="update", competitor=None):
+def summarize_update(content, source_type="update", competitor=None, previous_content=None):
     """
     Main summarization function with formatting for Slack/Notion.
+    Pass previous_content to summarize only what changed (see summarizer/diff.py).
     """
-    # Check if Gemini API is disabled via environment variable
-    if os.getenv("DISABLE_GEMINI_API", "false").lower() == "true":
-        print("Gemini API disabled via DISABLE_GEMINI_API environment variable. Using fallback summarization.")
-        summary = simple_summarize(content, source_type)
-    else:
-        summary = summarize_with_gemini(content, source_type)
+    summary = summarize_with_backend(content, source_type, previous_content=previous_content)
     formatted = format_for_slack_and_notion(summary, competitor=competitor, update_type=source_type)
     return truncate_summary(formatted)
-
-def should_skip_rate_limit_wait():
-    """Check if rate limit waiting should be skipped."""
-    return os.getenv("SKIP_RATE_LIMIT_WAIT", "false").lower() == "true" 
\ No newline at end of file
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test near-duplicate detection across runs against a temporary database.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import db.connection
+from db.connection import close_connection, get_connection
+from db.models import init_db, save_update, get_source_states
+from main import CompetitorTracker
+
+SOURCE_URL = "https://acme.test/blog"
+BASE_POST = (
+    "Acme is a collaborative workspace for product teams. Plan sprints, track issues and ship "
+    "releases from one place. Connect GitHub, Slack and Figma in a few clicks. Dashboards show "
+    "progress across every project, and automations handle the busywork so your team can focus "
+    "on building great software together."
+)
+
+# Each edit alone stays above the 0.85 blog threshold; all three together don't
+EDITS = [("busywork", "routine"), ("progress", "velocity"), ("Figma", "Linear")]
+
+class DriftTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(db.connection, 'DB_PATH', os.path.join(tmp.name, "tracker.db"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_connection)
+        init_db()
+        self.first_row = save_update('blog', SOURCE_URL, BASE_POST, 'Launch post', competitor_name='Acme')
+
+    def run_once(self, tracker, content):
+        """One tracker run: load state, detect, and save the way persist_stage does."""
+        tracker.source_states = get_source_states()
+        change = tracker.detect_change('blog', SOURCE_URL, content)
+        if change == 'minor':
+            tracker.record_minor_change('blog', SOURCE_URL, content, {'name': 'Acme'})
+        elif change == 'new':
+            save_update('blog', SOURCE_URL, content, 'Edited post', competitor_name='Acme')
+        return change
+
+    def test_small_edits_add_up_to_a_change(self):
+        tracker = CompetitorTracker()
+        content = BASE_POST
+        changes = []
+        for old, new in EDITS:
+            content = content.replace(old, new)
+            changes.append(self.run_once(tracker, content))
+        self.assertEqual(changes, ['minor', 'minor', 'new'])
+
+    def test_minor_change_keeps_the_notified_baseline(self):
+        tracker = CompetitorTracker()
+        self.assertEqual(self.run_once(tracker, BASE_POST.replace(*EDITS[0])), 'minor')
+        state = get_source_states()[SOURCE_URL]
+        self.assertEqual(state['last_row_id'], self.first_row)
+        # The minor version itself is now unchanged
+        tracker.source_states = get_source_states()
+        self.assertEqual(tracker.detect_change('blog', SOURCE_URL, BASE_POST.replace(*EDITS[0])), 'unchanged')
+
+    def test_migration_keeps_the_notified_baseline(self):
+        tracker = CompetitorTracker()
+        self.run_once(tracker, BASE_POST.replace(*EDITS[0]))
+        state = get_source_states()[SOURCE_URL]
+        # Rebuild source_state the way init_db does for databases created before it existed
+        with get_connection() as conn:
+            conn.execute("DELETE FROM source_state")
+        init_db()
+        rebuilt = get_source_states()[SOURCE_URL]
+        for field in ('content_hash', 'simhash', 'last_row_id'):
+            self.assertEqual(rebuilt[field], state[field])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test that init_db upgrades a database created before the fingerprint columns existed.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import db.connection
+from db.connection import close_connection
+from db.fingerprint import content_hash
+from db.models import init_db, get_source_states
+from scrapers.pricing import extract_pricing_info
+
+PRICING_PAGE = "Acme Pricing\nStarter $19/month\nTeam $49/month\nContact sales for Enterprise"
+CHANGELOG_PAGE = "v1.2 released: faster exports and a new API endpoint"
+
+class FingerprintMigrationTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "tracker.db")
+
+        # Schema from before comparison_key/content_hash/simhash/is_minor were added
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE competitor_updates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_type TEXT NOT NULL,
+                source_url TEXT,
+                content TEXT,
+                summary TEXT,
+                competitor_name TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.executemany("""
+            INSERT INTO competitor_updates (source_type, source_url, content, summary) VALUES (?, ?, ?, ?)
+        """, [
+            ('pricing', 'https://acme.test/pricing', PRICING_PAGE, 'Prices'),
+            ('changelog', 'https://acme.test/changelog', CHANGELOG_PAGE, 'Release'),
+        ])
+        conn.commit()
+        conn.close()
+
+        patcher = mock.patch.object(db.connection, 'DB_PATH', path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_connection)
+
+        init_db()
+        self.states = get_source_states()
+
+    def test_pricing_rows_use_extracted_pricing_info(self):
+        state = self.states['https://acme.test/pricing']
+        self.assertEqual(state['content_hash'], content_hash(extract_pricing_info(PRICING_PAGE)))
+        self.assertNotEqual(state['content_hash'], content_hash(PRICING_PAGE))
+
+    def test_other_rows_use_content(self):
+        state = self.states['https://acme.test/changelog']
+        self.assertEqual(state['content_hash'], content_hash(CHANGELOG_PAGE))
+        self.assertIsNotNone(state['simhash'])
+
+if __name__ == "__main__":
+    unittest.main()
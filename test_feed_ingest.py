@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test incremental feed ingestion against a local stub server and a temporary database.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+
+import db.connection
+from db.connection import close_connection
+from db.models import init_db, save_feed_state, get_feed_state, save_discovered_feed, get_discovered_feed
+from scrapers.blog import fetch_blog, fetch_blog_rss, FEED_GONE
+from scrapers.http_cache import NOT_MODIFIED
+
+MAX_NEW_ENTRIES = 3
+
+BLOG_PAGE = b"<html><body><article><h1>Scraped post</h1><p class='post-excerpt'>From the page.</p></article></body></html>"
+
+def build_feed(count):
+    """RSS feed with posts p0..p<count-1>, one day apart, newest first."""
+    items = "".join(
+        f"<item><guid>p{i}</guid><title>Post {i}</title><description>Body {i}.</description>"
+        f"<pubDate>{i + 1:02d} Jan 2024 10:00:00 GMT</pubDate></item>"
+        for i in reversed(range(count))
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Blog</title>{items}</channel></rss>'.encode('utf-8')
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the server's routes ({path: (status, content_type, body)}); anything else is a 404."""
+
+    def do_GET(self):
+        status, content_type, body = self.server.routes.get(self.path, (404, 'text/plain', b'Not found'))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServerTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patchers = [
+            mock.patch.object(db.connection, 'DB_PATH', os.path.join(tmp.name, "tracker.db")),
+            mock.patch.dict(os.environ, {'FEED_MAX_NEW_ENTRIES': str(MAX_NEW_ENTRIES)}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(close_connection)
+        init_db()
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.routes = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+class FeedBacklogTest(StubServerTest):
+    def test_backlog_is_returned_over_several_runs(self):
+        url = f"{self.base_url}/feed"
+        # p0 was seen last run; p1..p5 are new, two more than one run returns
+        self.server.routes['/feed'] = (200, 'application/rss+xml', build_feed(MAX_NEW_ENTRIES + 3))
+        save_feed_state(url, 'p0', '2024-01-01T10:00:00Z')
+
+        first = fetch_blog_rss(url)
+        self.assertEqual([line.split(':')[0] for line in first.split("\n\n")], ['Post 3', 'Post 2', 'Post 1'])
+        self.assertEqual(get_feed_state(url)['last_guid'], 'p3')
+
+        second = fetch_blog_rss(url)
+        self.assertEqual([line.split(':')[0] for line in second.split("\n\n")], ['Post 5', 'Post 4'])
+        self.assertEqual(get_feed_state(url)['last_guid'], 'p5')
+
+        self.assertIs(fetch_blog_rss(url), NOT_MODIFIED)
+
+class DiscoveredFeedTest(StubServerTest):
+    def setUp(self):
+        super().setUp()
+        self.blog_url = f"{self.base_url}/blog"
+        self.feed_url = f"{self.base_url}/feed"
+        self.server.routes['/blog'] = (200, 'text/html', BLOG_PAGE)
+        save_discovered_feed(self.blog_url, self.feed_url)
+
+    def test_transient_error_keeps_the_feed(self):
+        self.server.routes['/feed'] = (503, 'text/plain', b'Unavailable')
+        self.assertIsNone(fetch_blog_rss(self.feed_url))
+        self.assertIsNone(fetch_blog(self.blog_url))
+        self.assertEqual(get_discovered_feed(self.blog_url), self.feed_url)
+
+    def test_gone_feed_is_forgotten(self):
+        self.server.routes['/feed'] = (410, 'text/plain', b'Gone')
+        self.assertIs(fetch_blog_rss(self.feed_url), FEED_GONE)
+        self.assertEqual(fetch_blog(self.blog_url), "Scraped post: From the page.")
+        self.assertIsNone(get_discovered_feed(self.blog_url))
+
+    def test_html_response_is_not_a_feed(self):
+        self.server.routes['/feed'] = (200, 'text/html', BLOG_PAGE)
+        self.assertIs(fetch_blog_rss(self.feed_url), FEED_GONE)
+        self.assertEqual(fetch_blog(self.blog_url), "Scraped post: From the page.")
+        self.assertIsNone(get_discovered_feed(self.blog_url))
+
+if __name__ == "__main__":
+    unittest.main()
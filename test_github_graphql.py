@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test the batched GitHub GraphQL change check against a local stub server.
+"""
+
+import json
+import os
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+
+from scrapers.github_graphql import build_query, chunk_repos, fetch_github_batch, parse_repository
+
+class StubGraphQLHandler(BaseHTTPRequestHandler):
+    """Answers every POST with the server's canned payload and records the request."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests.append({
+            'authorization': self.headers.get('Authorization'),
+            'json': json.loads(body),
+        })
+        data = json.dumps(self.server.payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub(payload):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGraphQLHandler)
+    server.payload = payload
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/graphql"
+
+REPO_NODE = {
+    'latestRelease': {'databaseId': 42, 'publishedAt': '2024-05-01T10:00:00Z'},
+    'defaultBranchRef': {'name': 'main', 'target': {'oid': 'abc123'}},
+}
+
+class BuildQueryTest(unittest.TestCase):
+    def test_aliases_and_variables(self):
+        query, variables = build_query([('octo', 'one'), ('octo', 'two')])
+        self.assertIn('r0: repository(owner: $owner0, name: $name0)', query)
+        self.assertIn('r1: repository(owner: $owner1, name: $name1)', query)
+        self.assertIn('$owner1: String!, $name1: String!', query)
+        self.assertIn('rateLimit { cost remaining resetAt }', query)
+        self.assertEqual(variables, {'owner0': 'octo', 'name0': 'one', 'owner1': 'octo', 'name1': 'two'})
+        # Names travel as variables only
+        self.assertNotIn('octo', query)
+
+    def test_only_fields_used_by_the_change_check(self):
+        query, _ = build_query([('octo', 'one')])
+        self.assertIn('latestRelease { databaseId publishedAt }', query)
+        self.assertIn('... on Commit { oid }', query)
+        self.assertNotIn('refs(', query)
+        self.assertNotIn('history', query)
+
+    def test_chunks_fit_the_cost_budget(self):
+        repos = [('octo', f"repo{i}") for i in range(10)]
+        chunks = chunk_repos(repos, max_cost=9)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 3, 1])
+        self.assertEqual([repo for chunk in chunks for repo in chunk], repos)
+
+class ParseRepositoryTest(unittest.TestCase):
+    def test_parses_release_branch_and_head(self):
+        self.assertEqual(parse_repository(REPO_NODE), {
+            'release': {'id': 42, 'published_at': '2024-05-01T10:00:00Z'},
+            'branch': 'main',
+            'head_sha': 'abc123',
+        })
+
+    def test_repo_without_release_or_commits(self):
+        parsed = parse_repository({'latestRelease': None, 'defaultBranchRef': None})
+        self.assertEqual(parsed, {'release': None, 'branch': None, 'head_sha': None})
+        self.assertIsNone(parse_repository(None))
+
+class FetchGithubBatchTest(unittest.TestCase):
+    def fetch(self, payload, repos):
+        server, url = start_stub(payload)
+        self.addCleanup(server.shutdown)
+        with mock.patch.dict(os.environ, {'GITHUB_TOKEN': 'test-token', 'GITHUB_GRAPHQL_URL': url}):
+            return fetch_github_batch(repos), server.requests
+
+    def test_aliased_response(self):
+        payload = {
+            'data': {
+                'rateLimit': {'cost': 1, 'remaining': 4999, 'resetAt': '2024-05-01T11:00:00Z'},
+                'r0': REPO_NODE,
+                'r1': None,
+            },
+            'errors': [{'message': "Could not resolve to a Repository with the name 'octo/gone'."}],
+        }
+        results, requests = self.fetch(payload, [('octo', 'one'), ('octo', 'gone')])
+        self.assertEqual(results[('octo', 'one')]['head_sha'], 'abc123')
+        self.assertEqual(results[('octo', 'one')]['release']['id'], 42)
+        self.assertIsNone(results[('octo', 'gone')])
+
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]['authorization'], 'bearer test-token')
+        self.assertEqual(requests[0]['json']['variables']['name1'], 'gone')
+
+    def test_failed_query_falls_back_to_rest(self):
+        results, _ = self.fetch({'errors': [{'message': 'Bad credentials'}]}, [('octo', 'one')])
+        self.assertIsNone(results)
+
+    def test_no_token_skips_graphql(self):
+        with mock.patch.dict(os.environ, {'GITHUB_TOKEN': ''}):
+            self.assertIsNone(fetch_github_batch([('octo', 'one')]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Test volatile-text cleanup before change detection.
+"""
+
+import unittest
+
+from scrapers.normalize import normalize_text
+
+class NormalizeTextTest(unittest.TestCase):
+    def test_strips_volatile_url_parameters(self):
+        self.assertEqual(
+            normalize_text("Download https://acme.test/app.js?v=1.2.3 today"),
+            "Download https://acme.test/app.js today"
+        )
+        self.assertEqual(
+            normalize_text("https://acme.test/docs;jsessionid=ABC123?page=2&sid=xyz&t=99#intro"),
+            "https://acme.test/docs?page=2#intro"
+        )
+
+    def test_keeps_query_like_prose(self):
+        self.assertEqual(normalize_text("Switch with ?t=annual to pay yearly"), "Switch with ?t=annual to pay yearly")
+        self.assertEqual(normalize_text("Use sid=admin&v=2 in the form"), "Use sid=admin&v=2 in the form")
+
+    def test_strips_relative_timestamps(self):
+        self.assertEqual(normalize_text("Updated 5 minutes ago\n\nPro plan"), "Updated Pro plan")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test that streaming changelog extraction picks the same entry as the DOM path.
+"""
+
+import unittest
+
+from scrapers.changelog import CHANGELOG_SELECTORS
+from scrapers.streaming import StreamingExtractor
+
+HEADER_PAGE = (
+    "<html><body><header><h1>Acme Inc</h1></header>"
+    "<main><article><h2>v2.3 released with offline mode</h2><p>Details</p></article></main>"
+    "</body></html>"
+)
+
+def stream(markup, selectors, chunk_size=16):
+    extractor = StreamingExtractor(selectors=selectors)
+    for start in range(0, len(markup), chunk_size):
+        extractor.feed(markup[start:start + chunk_size])
+        if extractor.done:
+            break
+    else:
+        extractor.close()
+    return extractor
+
+class SelectorPriorityTest(unittest.TestCase):
+    def test_header_heading_does_not_beat_article_heading(self):
+        extractor = stream(HEADER_PAGE, CHANGELOG_SELECTORS)
+        self.assertEqual(extractor.match, "v2.3 released with offline mode")
+
+    def test_stops_early_on_top_priority_match(self):
+        markup = HEADER_PAGE.replace("</body>", "<footer>" + "x" * 5000 + "</footer></body>")
+        extractor = stream(markup, CHANGELOG_SELECTORS)
+        self.assertTrue(extractor.done)
+        self.assertEqual(extractor.match, "v2.3 released with offline mode")
+
+    def test_lower_priority_match_used_at_end_of_stream(self):
+        extractor = stream("<html><body><h1>Only heading</h1><p>Text</p></body></html>", CHANGELOG_SELECTORS)
+        self.assertFalse(extractor.done)
+        self.assertEqual(extractor.match, "Only heading")
+
+    def test_first_element_in_document_order_per_selector(self):
+        markup = "<body><div class='update-title'>Second</div><h2>First h2</h2><div class='update-title'>Third</div></body>"
+        extractor = stream(markup, [".update-title", "h2"])
+        self.assertEqual(extractor.match, "Second")
+
+    def test_empty_match_does_not_count(self):
+        markup = "<body><article><h2> </h2></article><article><h2>Real entry</h2></article></body>"
+        extractor = stream(markup, ["article h2", "h1"])
+        self.assertEqual(extractor.match, "Real entry")
+
+if __name__ == "__main__":
+    unittest.main()